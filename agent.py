@@ -1,22 +1,84 @@
 import os
+import sys
+import json
 import socket
 import platform
+import argparse
 import time
+from functools import lru_cache
 
-def heartbeat():
+# Where beats go: a path is a Unix datagram socket (same box), host:port is UDP.
+HEARTBEAT_ADDR = os.environ.get("DOMINA_HEARTBEAT", "/tmp/domina-heartbeat.sock")
+# One beat per INTERVAL seconds, shipped BATCH beats per datagram
+INTERVAL = 1.0
+BATCH = 10
+
+@lru_cache(maxsize=1)
+def identity():
+    """Host facts that never change while the agent runs; resolved once, not per beat."""
     hostname = socket.gethostname()
-    ip_addr = socket.gethostbyname(hostname)
-    uptime = os.popen('uptime -p').read().strip()
-    
+    try:
+        ip_addr = socket.gethostbyname(hostname)
+    except OSError:
+        ip_addr = "127.0.0.1"
+    return {"h": hostname, "ip": ip_addr, "os": f"{platform.system()} {platform.release()}"}
+
+def read_uptime():
+    with open('/proc/uptime', 'r') as f:
+        return float(f.read().split()[0])
+
+def pretty_uptime(seconds):
+    """Same shape as `uptime -p`, without the fork."""
+    minutes = int(seconds // 60)
+    days, rem = divmod(minutes, 1440)
+    hours, minutes = divmod(rem, 60)
+    parts = [f"{n} {unit}{'s' if n != 1 else ''}" for n, unit in
+             ((days, "day"), (hours, "hour"), (minutes, "minute")) if n]
+    return "up " + ", ".join(parts or ["0 minutes"])
+
+def open_channel(addr=HEARTBEAT_ADDR):
+    """(socket, destination) for a Unix datagram path or a host:port UDP target."""
+    if '/' in addr:
+        return socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM), addr
+    host, _, port = addr.rpartition(':')
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM), (host or "127.0.0.1", int(port))
+
+def pack(beats, every):
+    """One datagram: identity once, the flush cadence in seconds, then [ts, uptime, seq] per beat."""
+    return json.dumps({**identity(), "every": every, "beats": beats}, separators=(',', ':')).encode()
+
+def run_emitter(addr=HEARTBEAT_ADDR, interval=INTERVAL, batch=BATCH):
+    sock, dest = open_channel(addr)
+    beats, seq = [], 0
+    while True:
+        beats.append([round(time.time(), 3), round(read_uptime(), 1), seq])
+        seq += 1
+        if len(beats) >= batch:
+            try:
+                sock.sendto(pack(beats, round(interval * batch, 3)), dest)
+            except OSError:
+                pass  # Collector down: beats are disposable, the next batch will do
+            beats = []
+        time.sleep(interval)
+
+def heartbeat():
+    ident = identity()
     print(f"--- Mark 2 Agent Reporting ---")
     print(f"Status: OPERATIONAL")
-    print(f"Host: {hostname} ({ip_addr})")
-    print(f"OS: {platform.system()} {platform.release()}")
-    print(f"Uptime: {uptime}")
+    print(f"Host: {ident['h']} ({ident['ip']})")
+    print(f"OS: {ident['os']}")
+    print(f"Uptime: {pretty_uptime(read_uptime())}")
     print(f"------------------------------")
 
 if __name__ == "__main__":
-    while True:
+    parser = argparse.ArgumentParser(description="Mark 2 heartbeat agent")
+    parser.add_argument('--addr', default=HEARTBEAT_ADDR, help="Collector socket path or host:port")
+    parser.add_argument('--interval', type=float, default=INTERVAL, help="Seconds between beats")
+    parser.add_argument('--batch', type=int, default=BATCH, help="Beats per datagram")
+    parser.add_argument('--print', action='store_true', help="Print the status banner once and exit")
+    args = parser.parse_args()
+
+    if args.print:
         heartbeat()
-        # Sleep for 60 seconds so we don't spam the console
-        time.sleep(60)
\ No newline at end of file
+        sys.exit(0)
+    run_emitter(args.addr, args.interval, args.batch)
@@ -1,34 +1,238 @@
 import os
 import re
+import copy
+import time
 import yaml
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from collections.abc import Mapping
+
+PROJECTS_DIR = "/data/projects"
+PLACEHOLDER = '[SYSTEM R] - AWAITING DATA GRAFT'
+COMPACT_FORMAT = 'compact-v1'
+
+# Line grammar for the wreckage scanner (quoted or bare date keys, flow or block lists)
+_DATE_LINE = re.compile(r'^["\']?(\d{4}-\d{2}-\d{2})["\']?\s*:\s*(?:#.*)?$')
+_FIELD_LINE = re.compile(r'^([A-Za-z_]+)\s*:\s*(.*)$')
+_TOP_KEY = re.compile(r'^[A-Za-z_]+\s*:')
+_FLOW_ITEM = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|\'((?:[^\']|\'\')*)\'|([^,]+))')
+HARVEST_FIELDS = ('user', 'system', 'annum', 'sage_hooks')
+
+def _unquote(item):
+    item = item.strip()
+    if len(item) >= 2 and item[0] == item[-1] and item[0] in "'\"":
+        return item[1:-1]
+    return item
+
+def _outside_quotes(text):
+    """(index, char) for every character not inside a quoted scalar. Quotes only open a
+    scalar at the start of a value (after '[', ',' or leading space), so don't stays bare."""
+    i, n, start = 0, len(text), True
+    while i < n:
+        c = text[i]
+        if start and c in "'\"":
+            i += 1
+            while i < n:
+                if c == '"' and text[i] == '\\':
+                    i += 2
+                    continue
+                if text[i] == c:
+                    if c == "'" and text[i + 1:i + 2] == "'":
+                        i += 2
+                        continue
+                    break
+                i += 1
+            start = False
+        else:
+            yield i, c
+            if c in ",[":
+                start = True
+            elif not c.isspace():
+                start = False
+        i += 1
+
+def _flow_end(text):
+    """Index of the ']' closing a flow list, ignoring any inside quoted items; -1 if open."""
+    return next((i for i, c in _outside_quotes(text) if c == "]"), -1)
+
+def _strip_comment(text):
+    """Drops a trailing ' # comment' (YAML needs the space before '#'; quoted '#' is data)."""
+    for i, c in _outside_quotes(text):
+        if c == "#" and (i == 0 or text[i - 1].isspace()):
+            return text[:i].rstrip()
+    return text
+
+def _flow_items(body):
+    """'a, "b, c", 'd'' -> ['a', 'b, c', 'd'] (body is the text between [ and ])."""
+    items = []
+    for dq, sq, bare in _FLOW_ITEM.findall(body):
+        item = dq or sq.replace("''", "'") or bare.strip()
+        if item:
+            items.append(item)
+    return items
+
+class QuarterView(Mapping):
+    """Read-only date -> day mapping over a compact quarter (template + sparse overrides).
+
+    A day dict is only built the first time it is looked up; iterating the view
+    walks date strings without materializing anything.
+    """
+    def __init__(self, doc):
+        self.template = doc.get('template') or {}
+        self.overrides = doc.get('days') or {}
+        first, last = (datetime.strptime(d, '%Y-%m-%d') for d in doc['range'])
+        self._dates = [(first + timedelta(days=i)).strftime('%Y-%m-%d')
+                       for i in range((last - first).days + 1)]
+        self._known = set(self._dates)
+        self._days = {}
+
+    def __getitem__(self, date):
+        if date not in self._days:
+            if date not in self._known:
+                raise KeyError(date)
+            day = copy.deepcopy(self.template)
+            day.update(copy.deepcopy(self.overrides.get(date) or {}))
+            self._days[date] = day
+        return self._days[date]
+
+    def __iter__(self):
+        return iter(self._dates)
+
+    def __len__(self):
+        return len(self._dates)
+
+    def user_days(self):
+        """(date, user entries) for days with real user data; touches only overrides
+        unless the template itself carries user entries."""
+        dates = self._dates if self.template.get('user') not in ([], [PLACEHOLDER], None) else sorted(self.overrides)
+        for date in dates:
+            user = self[date].get('user') or []
+            if user and user != [PLACEHOLDER]:
+                yield date, user
+
+def quarter_view(data):
+    """Any loaded quarterly document -> date mapping (compact docs get a lazy QuarterView).
+    Returns None when data isn't a quarterly schedule."""
+    if not isinstance(data, dict) or not data:
+        return None
+    if data.get('format') == COMPACT_FORMAT:
+        return QuarterView(data)
+    if all(isinstance(k, str) and _DATE_LINE.match(f"{k}:") for k in data):
+        return data
+    return None
+
+def user_days(view):
+    """(date, user entries) with real data, for either quarter layout."""
+    if isinstance(view, QuarterView):
+        yield from view.user_days()
+        return
+    for date, day in view.items():
+        user = day.get('user') if isinstance(day, dict) else None
+        if user and user != [PLACEHOLDER]:
+            yield date, user
+
+def compact_quarter(matrix, template):
+    """Expanded matrix -> compact doc: the shared template plus per-day differences only."""
+    days = {}
+    for date, day in matrix.items():
+        diff = {k: v for k, v in day.items() if template.get(k) != v}
+        if diff:
+            days[date] = diff
+    dates = list(matrix)
+    return {'format': COMPACT_FORMAT, 'range': [dates[0], dates[-1]],
+            'template': template, 'days': days}
 
 class Cerberus:
-    def __init__(self, target_path='/data/projects/quarterly_master_schedule.yml'):
+    def __init__(self, target_path=os.path.join(PROJECTS_DIR, 'quarterly_master_schedule.yml'), compact=False):
         self.target_path = target_path
+        self.compact = compact
         self.control_dna = {
             "2025-12-11": ["Control: Past Entry - Verified"],
             "2025-12-18": ["Control: Mid-Quarter - Verified"],
             "2025-12-25": ["Control: Current Day - Verified"]
         }
 
+    def iter_wreckage(self, bak_path, wanted=HARVEST_FIELDS):
+        """Streams (date, {field: [items]}) blocks out of a damaged backup, one line at a time.
+
+        Only the fields actually present in a block are returned, so a day with no
+        `user:` key never borrows the next day's list. Unparseable lines are skipped.
+        """
+        date, fields, field, flow = None, {}, None, None
+        with open(bak_path, 'r', errors='replace') as f:
+            for line in f:
+                if flow is not None:  # inside a flow list that spans lines
+                    flow += " " + _strip_comment(line.strip())
+                    end = _flow_end(flow)
+                    if end != -1:
+                        fields[field] = _flow_items(flow[1:end])
+                        field, flow = None, None
+                    continue
+
+                text = line.strip()
+                lead = text[:1]
+                if lead.isdigit() or (lead in "'\"" and text[1:2].isdigit()):
+                    m = _DATE_LINE.match(text)  # indented too: compact files nest days under days:
+                    if m:
+                        if date:
+                            yield date, fields
+                        date, fields, field = m.group(1), {}, None
+                        continue
+                if line[:1] not in (" ", "\t"):
+                    if date and _TOP_KEY.match(line):  # template:/days:/format: end the block
+                        yield date, fields
+                        date, fields, field = None, {}, None
+                    continue
+                if date is None:
+                    continue
+
+                if text.startswith("- "):
+                    if field:
+                        fields[field].append(_unquote(_strip_comment(text[2:])))
+                    continue
+
+                m = _FIELD_LINE.match(text)
+                if not m:
+                    continue
+                key, value = m.groups()
+                field = key if key in wanted else None
+                if field is None:
+                    continue
+                if value.startswith("["):
+                    end = _flow_end(value)
+                    if end != -1:
+                        fields[field] = _flow_items(value[1:end])
+                        field = None
+                    else:
+                        flow = _strip_comment(value)
+                else:
+                    fields[field] = []  # block list follows (or bare `user:`)
+        if date:
+            yield date, fields
+
     def harvest_from_wreckage(self, bak_path):
         """Scrapes valid user data from wreckage. Always returns a dict."""
         harvested = {}
         if not os.path.exists(bak_path):
             return harvested
         try:
-            with open(bak_path, 'r') as f:
-                content = f.read()
-            pattern = r'(\d{4}-\d{2}-\d{2}):\s+.*?user:\s+\[(.*?)\]'
-            matches = re.findall(pattern, content, re.DOTALL)
-            for date_str, user_content in matches:
-                items = [item.strip().strip("'").strip('"') for item in user_content.split(',') if item.strip()]
-                harvested[date_str] = items
+            for date_str, fields in self.iter_wreckage(bak_path, wanted=('user',)):
+                if 'user' in fields:
+                    harvested[date_str] = fields['user']
         except Exception:
             pass
         return harvested
 
+    def default_day(self):
+        return {
+            'annum': [],
+            'sage_hooks': [],
+            'system': ['Scrape 01:00 - Y', 'Scrape 07:00 - Y', 'Scrape 13:00 - Y', 'Scrape 22:00 - Y'],
+            'user': [PLACEHOLDER]
+        }
+
     def build_sterile_matrix(self, year, quarter):
         """Architects a fresh, valid 90-92 day quarterly chassis."""
         # Calculate start date: Q1=Jan, Q2=Apr, Q3=Jul, Q4=Oct
@@ -45,41 +249,170 @@ class Cerberus:
                 break
                 
             d_str = current.strftime('%Y-%m-%d')
-            matrix[d_str] = {
-                'annum': [], 
-                'sage_hooks': [],
-                'system': ['Scrape 01:00 - Y', 'Scrape 07:00 - Y', 'Scrape 13:00 - Y', 'Scrape 22:00 - Y'],
-                'user': ['[SYSTEM R] - AWAITING DATA GRAFT']
-            }
+            matrix[d_str] = self.default_day()
         return matrix
 
-    def heal(self, bak_path, year=2025, quarter=4):
-        """The core methodology: Pathing -> Harvest -> Inject -> Build -> Graft -> Deploy."""
-        # 1. Rule: Only Q4 2025 is the master schedule; all others use yyyy-Q#.yml
+    def target_for(self, year, quarter):
+        # Rule: Only Q4 2025 is the master schedule; all others use yyyy-Q#.yml
         if year == 2025 and quarter == 4:
-            self.target_path = '/data/projects/quarterly_master_schedule.yml'
-        else:
-            self.target_path = f'/data/projects/{year}-Q{quarter}.yml'
+            return os.path.join(PROJECTS_DIR, 'quarterly_master_schedule.yml')
+        return os.path.join(PROJECTS_DIR, f'{year}-Q{quarter}.yml')
+
+    def _load_existing(self, path):
+        try:
+            with open(path, 'r') as f:
+                data = yaml.safe_load(f)
+            return data if isinstance(data, dict) else None
+        except Exception:
+            return None  # Missing or malformed: nothing to preserve, always rewrite
 
-        # 2. Process Data
+    def load_quarter(self, year, quarter):
+        """Date -> day mapping for a quarter in either layout, or None if missing/broken."""
+        return quarter_view(self._load_existing(self.target_for(year, quarter)))
+
+    def heal_quarter(self, harvested, year, quarter):
+        """Build -> Graft -> Diff -> Deploy for one quarter. Returns (path, counts, written).
+
+        Backup (and control DNA) entries win; days the backup doesn't cover keep any
+        real user entries already in the target; everything else gets the placeholder.
+        The target is only rewritten, atomically, if the result differs structurally.
+        """
+        path = self.target_for(year, quarter)
+        raw = self._load_existing(path)
+        existing = quarter_view(raw)
+        matrix = self.build_sterile_matrix(year, quarter)
+        counts = {"grafted": 0, "preserved": 0, "default": 0}
+
+        for date, day in matrix.items():
+            if date in harvested:
+                day['user'] = harvested[date]
+                counts["grafted"] += 1
+                continue
+            old = existing.get(date) if existing else None
+            old_user = old.get('user') if isinstance(old, dict) else None
+            if isinstance(old_user, list) and old_user and old_user != [PLACEHOLDER]:
+                day['user'] = old_user
+                counts["preserved"] += 1
+            else:
+                counts["default"] += 1
+
+        doc = compact_quarter(matrix, self.default_day()) if self.compact else matrix
+        if raw == doc:
+            return path, counts, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            yaml.dump(doc, f, indent=2, sort_keys=False, default_flow_style=False)
+        os.replace(path + '.tmp', path)
+        return path, counts, True
+
+    def _harvest_with_dna(self, bak_path):
         data = self.harvest_from_wreckage(bak_path)
         data.update(self.control_dna)
-        
-        # 3. Build Matrix
-        matrix = self.build_sterile_matrix(year, quarter)
-        
-        # 4. Graft survivors onto new chassis
-        for date, entries in data.items():
-            if date in matrix:
-                matrix[date]['user'] = entries
-        
-        # 5. Deploy
-        os.makedirs(os.path.dirname(self.target_path), exist_ok=True)
-        with open(self.target_path, 'w') as f:
-            yaml.dump(matrix, f, indent=2, sort_keys=False, default_flow_style=False)
-        print(f"HEAL COMPLETE: {self.target_path}")
+        return data
+
+    def heal(self, bak_path, year=2025, quarter=4):
+        """The core methodology: Pathing -> Harvest -> Inject -> Build -> Graft -> Deploy."""
+        self.target_path, counts, written = self.heal_quarter(self._harvest_with_dna(bak_path), year, quarter)
+        state = "COMPLETE" if written else "UNCHANGED"
+        print(f"HEAL {state}: {self.target_path} (grafted={counts['grafted']} "
+              f"preserved={counts['preserved']} default={counts['default']})")
+
+    def heal_range(self, bak_path, start, end, workers=None):
+        """Heals every quarter from start to end inclusive ((year, q) tuples) off one
+        parse of the backup, fanning quarters out over a process pool."""
+        harvested = self._harvest_with_dna(bak_path)
+        quarters = list(quarters_between(start, end))
+        # Ship each worker only its own quarter's slice of the harvest
+        slices = [{d: u for d, u in harvested.items() if _quarter_of(d) == yq} for yq in quarters]
+        workers = min(workers or os.cpu_count() or 1, len(quarters)) or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(_heal_worker, self.target_path, self.compact, s, y, q)
+                    for s, (y, q) in zip(slices, quarters)]
+            for (y, q), job in zip(quarters, jobs):
+                path, counts, written = job.result()
+                print(f"HEAL|{y}-Q{q}|{path}|grafted={counts['grafted']}|preserved={counts['preserved']}"
+                      f"|default={counts['default']}|{'written' if written else 'unchanged'}")
+
+def _quarter_of(date_str):
+    try:
+        return int(date_str[:4]), (int(date_str[5:7]) - 1) // 3 + 1
+    except ValueError:
+        return None
+
+def quarters_between(start, end):
+    year, q = start
+    while (year, q) <= tuple(end):
+        yield year, q
+        year, q = (year + 1, 1) if q == 4 else (year, q + 1)
+
+def _heal_worker(target_path, compact, harvested, year, quarter):
+    # Top-level so the process pool can pickle it
+    return Cerberus(target_path, compact).heal_quarter(harvested, year, quarter)
+
+def _parse_quarter(text):
+    """'2026-Q1' -> (2026, 1)"""
+    year, q = text.upper().split('-Q')
+    return int(year), int(q)
+
+def _regex_harvest(bak_path):
+    """The original slurp + DOTALL regex, kept only as the benchmark baseline."""
+    with open(bak_path, 'r') as f:
+        content = f.read()
+    pattern = r'(\d{4}-\d{2}-\d{2}):\s+.*?user:\s+\[(.*?)\]'
+    return {d: [i.strip().strip("'").strip('"') for i in u.split(',') if i.strip()]
+            for d, u in re.findall(pattern, content, re.DOTALL)}
+
+def _synthetic_backup(path, size_bytes, flow_lists=True):
+    """Multi-year wreckage: block lists, optional flow lists, and days without `user:`."""
+    day = datetime(2000, 1, 1)
+    with open(path, 'w') as f:
+        while f.tell() < size_bytes:
+            d = day.strftime('%Y-%m-%d')
+            f.write(f'{d}:\n  system:\n    - "Scrape 01:00 - Y"\n    - "Scrape 13:00 - Y"\n')
+            if flow_lists and day.day % 3 == 0:
+                f.write(f'  user: ["Entry {d}", \'Follow-up\']\n')
+            elif day.day % 3 != 2:
+                f.write(f'  user:\n    - "Entry {d}"\n')
+            f.write('  sage_hooks: []\n\n')
+            day += timedelta(days=1)
+
+def bench_harvest(target_mb=12):
+    """Streaming harvest vs the old regex. The block-only case (no `user: [...]` anywhere)
+    makes the regex rescan to EOF from every date, so it only gets a 64 KB file."""
+    fd, path = tempfile.mkstemp(suffix='.yml.bak')
+    os.close(fd)
+    cases = [("mixed", target_mb * 2**20, True, True),
+             ("block-only", 64 * 2**10, False, True),
+             ("block-only", target_mb * 2**20, False, False)]
+    try:
+        for label, size, flow, with_regex in cases:
+            _synthetic_backup(path, size, flow)
+            mb = os.path.getsize(path) / 2**20
+            runners = [("regex", _regex_harvest)] if with_regex else []
+            runners.append(("stream", Cerberus().harvest_from_wreckage))
+            for name, fn in runners:
+                start = time.perf_counter()
+                days = len(fn(path))
+                print(f"BENCH|{label}|{name}|{mb:.2f}MB|{days} days|{time.perf_counter() - start:.3f}s")
+    finally:
+        os.remove(path)
 
 if __name__ == "__main__":
-    # Internal trigger for testing
-    c = Cerberus()
-    c.heal('/data/projects/quarterly_master_schedule.yml.bak', 2026, 1)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bench', type=int, nargs='?', const=12, metavar='MB',
+                        help="Benchmark streaming harvest vs the old regex on a synthetic backup")
+    parser.add_argument('--bak', default=os.path.join(PROJECTS_DIR, 'quarterly_master_schedule.yml.bak'))
+    parser.add_argument('--from', dest='start', type=_parse_quarter, metavar='YYYY-QN')
+    parser.add_argument('--to', dest='end', type=_parse_quarter, metavar='YYYY-QN')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--compact', action='store_true', help="Write template + sparse-override quarters")
+    args = parser.parse_args()
+    if args.bench:
+        bench_harvest(args.bench)
+    elif args.start:
+        Cerberus(compact=args.compact).heal_range(args.bak, args.start, args.end or args.start, args.workers)
+    else:
+        # Internal trigger for testing
+        c = Cerberus(compact=args.compact)
+        c.heal('/data/projects/quarterly_master_schedule.yml.bak', 2026, 1)
@@ -1,21 +1,63 @@
 import os
+import sys
+import gzip
+import json
+import shutil
 from datetime import datetime
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 REPORT_ROOT = "/data/reports"
 DASH_OUTPUT = "/data/reports/dashboard.html"
+STATE_PATH = "/data/reports/dashboard.state.json"
+
+DASH_TAIL = """
+            </div>
+        </body></html>"""
+
+class _TeeWriter:
+    """Fans each chunk out to the plain, gzip and (optional) brotli outputs."""
+    def __init__(self, raw, gz, br=None):
+        self.raw, self.gz, self.br = raw, gz, br
+        self.br_comp = brotli.Compressor() if br else None
+
+    def write(self, chunk):
+        self.raw.write(chunk)
+        self.gz.write(chunk)
+        if self.br_comp:
+            self.br.write(self.br_comp.process(chunk))
+
+    def close(self):
+        if self.br_comp:
+            self.br.write(self.br_comp.finish())
 
 class CoreDashboard:
-    def assemble(self):
-        # Gather only the fragments
-        fragments = [f for f in os.listdir(REPORT_ROOT) if f.endswith(".frag.html")]
-        fragments.sort() # Keep them in alphabetical/logical order
-        
-        frag_content = ""
+    def outputs(self):
+        paths = [DASH_OUTPUT, DASH_OUTPUT + ".gz"]
+        if brotli:
+            paths.append(DASH_OUTPUT + ".br")
+        return paths
+
+    def fingerprint(self, fragments):
+        """Cheap change detector: (name, mtime_ns, size) per fragment."""
+        sig = []
         for f_name in fragments:
-            with open(os.path.join(REPORT_ROOT, f_name), 'r', encoding='utf-8') as f:
-                frag_content += f.read()
+            st = os.stat(os.path.join(REPORT_ROOT, f_name))
+            sig.append([f_name, st.st_mtime_ns, st.st_size])
+        return sig
+
+    def _load_state(self):
+        try:
+            with open(STATE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
 
-        html = f"""
+    def _head(self, data_time):
+        return f"""
         <!DOCTYPE html><html><head>
         <title>KURO COMMAND CENTER</title>
         <style>
@@ -43,15 +85,48 @@ class CoreDashboard:
             .timestamp {{ float: right; font-size: 0.5em; color: #58a6ff; }}
         </style>
         </head><body>
-            <h1>KURO COMMAND CENTER <span class="timestamp">SYNC: {datetime.now().strftime('%Y-%m-%d %H:%M')}</span></h1>
+            <h1>KURO COMMAND CENTER <span class="timestamp">DATA AS OF: {data_time.strftime('%Y-%m-%d %H:%M')}</span></h1>
             <div class="grid">
-                {frag_content if frag_content else "<p>Waiting for fragments...</p>"}
-            </div>
-        </body></html>"""
+                """
+
+    def assemble(self, force=False):
+        # Gather only the fragments
+        fragments = [f for f in os.listdir(REPORT_ROOT) if f.endswith(".frag.html")]
+        fragments.sort() # Keep them in alphabetical/logical order
+
+        sig = self.fingerprint(fragments)
+        # Stamp the newest fragment's time, not the build time: an unchanged page then stays
+        # accurate when the rebuild is skipped
+        data_time = datetime.fromtimestamp(max(m for _, m, _ in sig) / 1e9) if sig else datetime.now()
+        if not force and sig == self._load_state() and all(os.path.exists(p) for p in self.outputs()):
+            print(f"--- DASHBOARD_UNCHANGED: {DASH_OUTPUT} ---")
+            return
+
+        # Stream head -> fragments -> tail into temp files, then swap them all in
+        tmp = {p: p + ".tmp" for p in self.outputs()}
+        with open(tmp[DASH_OUTPUT], 'wb') as raw, \
+             open(tmp[DASH_OUTPUT + ".gz"], 'wb') as gz_file, \
+             gzip.GzipFile(fileobj=gz_file, mode='wb', compresslevel=9, mtime=0) as gz:
+            br = open(tmp[DASH_OUTPUT + ".br"], 'wb') if brotli else None
+            try:
+                out = _TeeWriter(raw, gz, br)
+                out.write(self._head(data_time).encode('utf-8'))
+                for f_name in fragments:
+                    with open(os.path.join(REPORT_ROOT, f_name), 'rb') as f:
+                        shutil.copyfileobj(f, out)
+                if not fragments:
+                    out.write(b"<p>Waiting for fragments...</p>")
+                out.write(DASH_TAIL.encode('utf-8'))
+                out.close()
+            finally:
+                if br: br.close()
 
-        with open(DASH_OUTPUT, "w", encoding="utf-8") as f:
-            f.write(html)
-        print(f"--- DASHBOARD_READY: {DASH_OUTPUT} ---")
+        for final, staged in tmp.items():
+            os.replace(staged, final)
+        with open(STATE_PATH + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(sig, f)
+        os.replace(STATE_PATH + ".tmp", STATE_PATH)
+        print(f"--- DASHBOARD_READY: {DASH_OUTPUT} ({len(fragments)} fragments) ---")
 
 if __name__ == "__main__":
-    CoreDashboard().assemble()
+    CoreDashboard().assemble(force="--force" in sys.argv)
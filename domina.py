@@ -1,14 +1,195 @@
-import sys, yaml, os, subprocess
+import sys, os, json, socket
+
+SOCKET_PATH = os.environ.get("DOMINA_SOCKET", f"/tmp/domina-{os.getuid()}.sock")
+# Served by a warm `domina.py serve` daemon when one is listening. run/review stay
+# in-process because they need the caller's terminal (subprocess stdio, input()).
+DAEMON_COMMANDS = ("agenda", "report", "propose", "update_timestamp", "compact", "agents")
+
+def call_daemon(cmd, args=()):
+    """Thin client: returns the daemon's rendered output, or None if nobody is listening."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(60)
+            sock.connect(SOCKET_PATH)
+            sock.sendall(json.dumps({"cmd": cmd, "args": list(args)}).encode() + b"\n")
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8")
+    except OSError:
+        return None
+
+# Fast path runs before yaml/dateutil are imported so a warm daemon answers in a few ms
+if __name__ == "__main__" and (sys.argv[1] if len(sys.argv) > 1 else "agenda") in DAEMON_COMMANDS:
+    _out = call_daemon(sys.argv[1] if len(sys.argv) > 1 else "agenda", sys.argv[2:])
+    if _out is not None:
+        sys.stdout.write(_out)
+        sys.exit(0)
+
+import io, yaml, time, heapq, bisect, signal, argparse, threading, subprocess, contextlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from dateutil.rrule import rrulestr
+import journal
 
 PROJECTS_DIR = "/data/projects"
 PLAYBOOK_PATH = os.path.join(PROJECTS_DIR, "playbook.yml")
+# Fixed rule anchor (a Monday) so INTERVAL=2 style rules don't drift with call time.
+# A schedule can override it with its own `dtstart: YYYY-MM-DD`.
+SCHEDULE_ANCHOR = datetime(2025, 1, 6)
+# Default worker pool for run/run-all; plays with no dependency between them overlap
+PLAY_WORKERS = 4
+# agent.py beats land here (socket path, or host:port for UDP from other boxes)
+HEARTBEAT_ADDR = os.environ.get("DOMINA_HEARTBEAT", "/tmp/domina-heartbeat.sock")
+# An agent is stale once it has missed this many flushes (agents send their cadence as "every")
+HEARTBEAT_STALE_FLUSHES = 3
+# ...or, for agents that do not report a cadence, once its last datagram is this old
+HEARTBEAT_STALE = 30
+
+def _stat_sig(path):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+class WarmModel:
+    """Daemon memory: parsed files keyed by path, dropped as soon as their stat signature moves."""
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, path, loader, *watch):
+        sig = tuple(_stat_sig(p) for p in (path, *watch))
+        entry = self.entries.get(path)
+        if entry and entry[0] == sig:
+            return entry[1]
+        value = loader(path)
+        if value is None:
+            self.entries.pop(path, None)  # Malformed: re-read (and re-report) every time
+        else:
+            self.entries[path] = (sig, value)
+        return value
+
+class ScheduleIndex:
+    """Playbook schedules compiled once into rrulesets, with occurrences materialized
+    over a horizon that only ever grows. Queries are a bisect into one merged timeline."""
+    def __init__(self, schedules):
+        self.items, self.rule_of = [], []
+        self.rules, keys = [], {}
+        for item in schedules or []:
+            try:
+                anchor = item.get('dtstart')
+                anchor = datetime.fromisoformat(str(anchor)) if anchor else SCHEDULE_ANCHOR
+                key = (item['rule'], anchor)
+                if key not in keys:  # identical rules share one compiled set
+                    self.rules.append(rrulestr(item['rule'], dtstart=anchor, forceset=True))
+                    keys[key] = len(self.rules) - 1
+                self.rule_of.append(keys[key])
+                self.items.append(item)
+            except Exception:
+                continue  # Bad rule: skipped, same as the old per-call parse
+        self.start = self.end = None
+        self.timeline, self.stamps = [], []
+
+    def _materialize(self, start, end):
+        if self.start is not None:
+            start, end = min(start, self.start), max(end, self.end)
+        occurrences = [rule.between(start, end, inc=True) for rule in self.rules]
+        per_item = ([(occ, i) for occ in occurrences[r]] for i, r in enumerate(self.rule_of))
+        self.timeline = list(heapq.merge(*per_item))
+        self.stamps = [occ for occ, _ in self.timeline]
+        self.start, self.end = start, end
+
+    def between(self, start, end, platform=None, requires_wake=None):
+        """Yields (occurrence, item) in time order within [start, end]."""
+        if self.start is None or start < self.start or end > self.end:
+            self._materialize(start, end)
+        lo = bisect.bisect_left(self.stamps, start)
+        hi = bisect.bisect_right(self.stamps, end)
+        for occ, i in self.timeline[lo:hi]:
+            item = self.items[i]
+            if platform and platform.lower() not in str(item.get('platform', '')).lower():
+                continue
+            if requires_wake is not None and bool(item.get('requires_wake')) != requires_wake:
+                continue
+            yield occ, item
+
+class HeartbeatCollector:
+    """In-memory last-seen table fed by agent.py datagrams. One recv per batch, no disk."""
+    def __init__(self, addr=HEARTBEAT_ADDR, stale_after=HEARTBEAT_STALE):
+        self.addr, self.stale_after = addr, stale_after
+        self.hosts, self.lock = {}, threading.Lock()
+        self.sock = None
+
+    def bind(self):
+        if '/' in self.addr:
+            if os.path.exists(self.addr):
+                os.unlink(self.addr)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(self.addr)
+        else:
+            host, _, port = self.addr.rpartition(':')
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind((host, int(port)))
+        return self
+
+    def ingest(self, datagram, now=None):
+        """Folds one batch in; malformed datagrams are dropped."""
+        try:
+            msg = json.loads(datagram)
+            ts, uptime, seq = msg["beats"][-1]
+            host = msg["h"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return False
+        with self.lock:
+            entry = self.hosts.setdefault(host, {"beats": 0})
+            entry.update(ip=msg.get("ip"), os=msg.get("os"), ts=ts, uptime=uptime, seq=seq,
+                         every=msg.get("every"), seen=now or time.time(),
+                         beats=entry["beats"] + len(msg["beats"]))
+        return True
+
+    def run(self):
+        while True:
+            try:
+                self.ingest(self.sock.recv(65536))
+            except OSError:
+                return  # socket closed on shutdown
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            if '/' in self.addr and os.path.exists(self.addr):
+                os.unlink(self.addr)
+
+    def stale_limit(self, entry):
+        """Seconds of silence before a host counts as stale, from its own flush cadence."""
+        every = entry.get("every")
+        if isinstance(every, (int, float)) and every > 0:
+            return HEARTBEAT_STALE_FLUSHES * every
+        return self.stale_after
+
+    def status(self, now=None):
+        """[(host, entry, age, stale)] sorted stale-first, then by host."""
+        now = now or time.time()
+        with self.lock:
+            rows = [(host, dict(e), now - e["seen"], now - e["seen"] > self.stale_limit(e))
+                    for host, e in self.hosts.items()]
+        return sorted(rows, key=lambda r: (not r[3], r[0]))
 
 class DominaCLI:
     # ANSI Color Codes
     G, Y, R, RESET = "\033[92m", "\033[93m", "\033[91m", "\033[0m"
 
+    def __init__(self, model=None, collector=None):
+        # Only the daemon holds a WarmModel; one-shot runs always read from disk
+        self.model = model
+        # ...and the heartbeat collector, since last-seen times only live in memory
+        self.collector = collector
+
     def color_log(self, level, message):
         """Returns a color-formatted string for terminal output."""
         icon = {"G": "●", "Y": "▲", "R": "■"}.get(level, "○")
@@ -25,76 +206,232 @@ class DominaCLI:
                 return None
         return {}
 
-    def log_event(self, project_file, task, status, msg, urgent=False):
-        """NASA-grade Dual-Track Memory: 150-entry FIFO + Critical Pinning."""
+    def _project_path(self, project_file):
         if not project_file.endswith(".yml"):
             project_file += ".yml"
-        path = os.path.join(PROJECTS_DIR, project_file)
-        data = self._load_yaml(path)
-        if data is None: return
+        return os.path.join(PROJECTS_DIR, project_file)
 
-        meta = data.setdefault('project_metadata', {})
-        meta['status'] = status
-        meta['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        entry = {"ts": meta['last_updated'], "task": task, "status": status, "msg": msg}
-        logs = data.setdefault('logs', {})
+    def _load_project(self, path):
+        """YAML snapshot plus the not-yet-compacted journal tail. Treat as read-only."""
+        loader = lambda p: journal.overlay(self._load_yaml(p), p)
+        if self.model is None:
+            return loader(path)
+        return self.model.get(path, loader, journal.journal_path(path))
 
-        if urgent or status == "R":
-            logs.setdefault('pinned', []).append(entry)
-            meta['alert_msg'] = msg
+    def _load_playbook(self):
+        if self.model is None:
+            return self._load_yaml(PLAYBOOK_PATH)
+        return self.model.get(PLAYBOOK_PATH, self._load_yaml)
+
+    def log_event(self, project_file, task, status, msg, urgent=False):
+        """NASA-grade Dual-Track Memory: 150-entry FIFO + Critical Pinning.
+
+        Events land in the project's append-only journal; compact() folds them
+        back into logs.fifo / logs.pinned once the journal passes COMPACT_BYTES.
+        """
+        path = self._project_path(project_file)
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M")
+        size = journal.append(path, ts, task, status, msg, pinned=urgent or status == "R")
+        if size >= journal.COMPACT_BYTES:
+            journal.compact(path)
+
+    def compact(self, project_file=None):
+        """Folds journals into their YAML (one project, or every head)."""
+        if project_file:
+            paths = [self._project_path(project_file)]
         else:
-            fifo = logs.setdefault('fifo', [])
-            fifo.append(entry)
-            logs['fifo'] = fifo[-150:]
+            paths = journal.heads(PROJECTS_DIR)
+        folded = sum(journal.compact(p) for p in paths)
+        print(self.color_log("G", f"Compacted {folded} journal events across {len(paths)} heads."))
 
-        with open(path, 'w') as f:
-            yaml.dump(data, f, sort_keys=False)
+    def _agenda_index(self):
+        build = lambda _: ScheduleIndex((self._load_playbook() or {}).get('schedules', []))
+        if self.model is None:
+            return build(None)
+        return self.model.get("agenda-index", build, PLAYBOOK_PATH)
 
-    def get_agenda(self):
-        playbook = self._load_yaml(PLAYBOOK_PATH)
-        schedules = playbook.get('schedules', [])
-        now = datetime.now()
-        end_of_week = now + timedelta(days=7)
-        
-        print(f"\n--- [ Hydra Agenda: {now.strftime('%Y-%m-%d')} ] ---")
+    @staticmethod
+    def _date_arg(text):
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text!r}")
+
+    def get_agenda(self, *argv):
+        parser = argparse.ArgumentParser(prog="domina.py agenda")
+        parser.add_argument('--days', type=int, default=7, help="Calendar days from today, inclusive (default 7)")
+        parser.add_argument('--from', dest='start', type=self._date_arg, help="YYYY-MM-DD (overrides today)")
+        parser.add_argument('--to', dest='end', type=self._date_arg, help="YYYY-MM-DD, inclusive (overrides --days)")
+        parser.add_argument('--platform', help="Substring match on schedule platform")
+        wake = parser.add_mutually_exclusive_group()
+        wake.add_argument('--wake', dest='requires_wake', action='store_const', const=True)
+        wake.add_argument('--no-wake', dest='requires_wake', action='store_const', const=False)
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            return
+
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = args.start or today
+        # --days N covers N calendar days including the first, so the last is start + N - 1
+        end = args.end or start + timedelta(days=max(args.days, 1) - 1)
+        end = end.replace(hour=23, minute=59, second=59)
+
+        print(f"\n--- [ Hydra Agenda: {start.strftime('%Y-%m-%d')} -> {end.strftime('%Y-%m-%d')} ] ---")
         found = False
-        for item in schedules:
-            try:
-                rule = rrulestr(item['rule'], dtstart=now)
-                next_occ = rule.after(now, inc=True)
-                if next_occ and next_occ <= end_of_week:
-                    level = "R" if item.get('requires_wake') else "G"
-                    status_icon = "⚡" if level == "R" else "☁️"
-                    msg = f"[{next_occ.strftime('%a %d')}] {item['task']} {status_icon}"
-                    print(self.color_log(level, msg))
-                    found = True
-            except Exception:
-                continue
+        for occ, item in self._agenda_index().between(start, end, args.platform, args.requires_wake):
+            level = "R" if item.get('requires_wake') else "G"
+            status_icon = "⚡" if level == "R" else "☁️"
+            msg = f"[{occ.strftime('%a %d')}] {item['task']} {status_icon}"
+            print(self.color_log(level, msg))
+            found = True
         if not found:
             print("No actionable events scheduled.")
 
-    def run_play(self, play_id):
-        playbook = self._load_yaml(PLAYBOOK_PATH)
-        play = next((p for p in playbook.get('immortal_plays', []) if p['id'] == play_id), None)
-        target = play_id.split('_')[0] if "_" in play_id else "hydra"
+    def _play_target(self, play_id):
+        return play_id.split('_')[0] if "_" in play_id else "hydra"
+
+    def _exec_play(self, play, print_lock):
+        """One play with retries and timeout; output streamed with a [id] prefix.
 
-        if play:
+        Returns (exit code or None on timeout, wall seconds, attempts used).
+        """
+        play_id = play['id']
+        timeout = play.get('timeout')
+        attempts = int(play.get('retries', 0)) + 1
+        start = time.perf_counter()
+        rc = None
+        for attempt in range(1, attempts + 1):
+            with print_lock:
+                print(f"[*] Executing {play_id} (attempt {attempt}/{attempts})...")
+            # Own session so a timeout can kill the whole shell pipeline
+            proc = subprocess.Popen(play['cmd'], shell=True, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, errors='replace',
+                                    start_new_session=True)
+            timed_out = threading.Event()
+            def kill():
+                if proc.poll() is not None:
+                    return  # Finished right at the deadline: that is a real exit code, not a timeout
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    return
+                timed_out.set()
+            timer = threading.Timer(timeout, kill) if timeout else None
+            if timer: timer.start()
             try:
-                print(f"[*] Executing {play_id}...")
-                subprocess.run(play['cmd'], shell=True, check=True)
-                self.log_event(target, play_id, "G", "Success")
-            except subprocess.CalledProcessError as e:
-                self.log_event(target, play_id, "R", str(e), urgent=True)
-                print(self.color_log("R", f"Execution failed: {e}"))
-        else:
-            print(f"[!] Play {play_id} not found.")
+                for line in proc.stdout:
+                    with print_lock:
+                        print(f"[{play_id}] {line.rstrip()}")
+                rc = proc.wait()
+            except BaseException:
+                # Never leave the pipeline running (or unreaped) behind a failed read
+                if proc.poll() is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        os.killpg(proc.pid, signal.SIGKILL)
+                proc.wait()
+                raise
+            finally:
+                if timer: timer.cancel()
+            if timed_out.is_set():
+                rc = None
+            if rc == 0:
+                break
+        return rc, time.perf_counter() - start, attempt
+
+    def run_plays(self, play_ids=None, workers=PLAY_WORKERS):
+        """DAG executor: plays start as soon as their depends_on (within this run) succeed."""
+        playbook = self._load_yaml(PLAYBOOK_PATH) or {}
+        plays = {p['id']: p for p in playbook.get('immortal_plays', [])}
+        selected = []
+        for pid in (list(plays) if play_ids is None else play_ids):
+            if pid in plays:
+                selected.append(pid)
+            else:
+                print(f"[!] Play {pid} not found.")
+        # Dependencies outside this run count as already satisfied
+        deps = {}
+        for pid in selected:
+            wanted = plays[pid].get('depends_on') or []
+            if isinstance(wanted, str): wanted = [wanted]
+            deps[pid] = [d for d in wanted if d in selected]
+
+        print_lock = threading.Lock()
+        results = {}  # id -> (status, exit code, wall seconds)
+        pending = dict(deps)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            while pending or running:
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for pid in [p for p, d in pending.items() if all(x in results for x in d)]:
+                        del pending[pid]
+                        progressed = True
+                        failed = [d for d in deps[pid] if results[d][0] != "G"]
+                        if failed:
+                            msg = f"Skipped: dependency {', '.join(failed)} failed"
+                            results[pid] = ("Y", None, 0.0)
+                            self.log_event(self._play_target(pid), pid, "Y", msg)
+                            with print_lock: print(self.color_log("Y", f"{pid}: {msg}"))
+                        else:
+                            running[pool.submit(self._exec_play, plays[pid], print_lock)] = pid
+                if not running:
+                    for pid in pending:
+                        print(self.color_log("R", f"{pid}: dependency cycle, not run"))
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pid = running.pop(fut)
+                    error = None
+                    try:
+                        rc, wall, attempt = fut.result()
+                    except Exception as e:
+                        rc, wall, attempt, error = None, 0.0, 1, e
+                    target = self._play_target(pid)
+                    if rc == 0:
+                        results[pid] = ("G", rc, wall)
+                        msg = f"Success: exit 0 in {wall:.1f}s"
+                        self.log_event(target, pid, "G", msg)
+                    else:
+                        if error is not None:
+                            why = f"error: {error}"
+                        elif rc is None:
+                            why = f"timeout after {plays[pid].get('timeout')}s"
+                        else:
+                            why = f"exit {rc}"
+                        results[pid] = ("R", rc, wall)
+                        msg = f"Failed: {why} in {wall:.1f}s ({attempt} attempts)"
+                        self.log_event(target, pid, "R", msg, urgent=True)
+                    with print_lock:
+                        print(self.color_log(results[pid][0], f"{pid}: {msg}"))
+
+        if len(results) > 1:
+            print(f"\n--- [ Play Summary ] ---")
+            for pid in selected:
+                if pid in results:
+                    status, rc, wall = results[pid]
+                    print(self.color_log(status, f"{pid:<15} exit={rc} wall={wall:.1f}s"))
+        return results
+
+    def run_play(self, *argv, run_all=False):
+        """run a[,b,c] [--workers N]  |  run-all [--workers N]"""
+        parser = argparse.ArgumentParser(prog="domina.py run-all" if run_all else "domina.py run")
+        if not run_all:
+            parser.add_argument('plays', help="Comma-separated play ids")
+        parser.add_argument('--workers', type=int, default=PLAY_WORKERS)
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            return
+        ids = None if run_all else [p.strip() for p in args.plays.split(',') if p.strip()]
+        self.run_plays(ids, args.workers)
 
     def review(self, project_file):
         """Interactive CLI session to update project status and review bugs."""
-        if not project_file.endswith(".yml"):
-            project_file += ".yml"
-        path = os.path.join(PROJECTS_DIR, project_file)
+        path = self._project_path(project_file)
+        journal.compact(path)  # review rewrites the YAML, so fold pending events first
         data = self._load_yaml(path)
         if not isinstance(data, dict): return
         
@@ -126,48 +463,107 @@ class DominaCLI:
     def report(self):
         """The Narrator Bridge: Context for LLM with Health Stats."""
         context = []
-        for f in os.listdir(PROJECTS_DIR):
-            if f.endswith(".yml") and f != "playbook.yml":
-                d = self._load_yaml(os.path.join(PROJECTS_DIR, f))
-                if not isinstance(d, dict): continue
-
-                logs_data = d.get('logs', {})
-                if not isinstance(logs_data, dict): logs_data = {}
-                
-                fifo = logs_data.get('fifo', [])
-                total = len(fifo)
-                successes = len([e for e in fifo if e['status'] == "G"])
-                rate = (successes / total * 100) if total > 0 else 100
-                
-                context.append({
-                    "project": f,
-                    "health": f"{rate:.1f}%",
-                    "recent": fifo[-5:],
-                    "pinned": logs_data.get('pinned', [])
-                })
+        for path in journal.heads(PROJECTS_DIR):
+            f = os.path.basename(path)
+            d = self._load_project(path)
+            if not isinstance(d, dict): continue
+
+            logs_data = d.get('logs', {})
+            if not isinstance(logs_data, dict): logs_data = {}
+            
+            fifo = logs_data.get('fifo', [])
+            total = len(fifo)
+            successes = len([e for e in fifo if e['status'] == "G"])
+            rate = (successes / total * 100) if total > 0 else 100
+            
+            context.append({
+                "project": f,
+                "health": f"{rate:.1f}%",
+                "recent": fifo[-5:],
+                "pinned": logs_data.get('pinned', [])
+            })
         print(f"\n--- [ {self.Y}Narrator Context{self.RESET} ] ---")
         print(yaml.dump(context, sort_keys=False))
 
     def propose(self, goal):
-        cmd = "rsync -avzu /data/projects/ kuma@pusheen:/mnt/d/007/projects/"
+        cmd = "python3 ~/agents/mirror.py /data/projects kuma@pusheen:/mnt/d/007/projects --update"
         if "agent" in goal.lower():
+            # Stays on rsync: this is the sync that deploys mirror.py to the far end
             cmd = "rsync -avzu ~/agents/ kuma@pusheen:/mnt/d/007/agents/"
         print(yaml.dump([{"id": "sync", "cmd": cmd}], sort_keys=False))
 
-    def execute(self, cmd, target=None):
-        if cmd == "agenda": self.get_agenda()
-        elif cmd == "run": self.run_play(target)
+    def execute(self, cmd, *args):
+        target = args[0] if args else None
+        if cmd == "agenda": self.get_agenda(*args)
+        elif cmd == "run": self.run_play(*args)
+        elif cmd == "run-all": self.run_play(*args, run_all=True)
         elif cmd == "report": self.report()
         elif cmd == "review": self.review(target)
         elif cmd == "propose": self.propose(target)
         elif cmd == "update_timestamp": self.update_timestamp()
+        elif cmd == "compact": self.compact(target)
+        elif cmd == "agents": self.agents()
         else: print(f"[!] {cmd} unknown.")
 
+    def agents(self):
+        """Last-seen table for every agent that has reported since the daemon started."""
+        if self.collector is None:
+            return print(self.color_log("Y", "No collector: heartbeats are tracked by `domina.py serve`."))
+        rows = self.collector.status()
+        if not rows:
+            return print(self.color_log("Y", f"No heartbeats yet on {self.collector.addr}"))
+        for host, e, age, stale in rows:
+            line = f"{host:<15} {e['ip'] or '?':<15} up {e['uptime'] / 3600:.1f}h  seen {age:.0f}s ago  beats={e['beats']}"
+            print(self.color_log("R" if stale else "G", ("STALE " if stale else "") + line))
+
+    def serve(self):
+        """Warm daemon: one request per connection, output captured and sent back."""
+        if call_daemon("agenda") is not None:
+            return print(self.color_log("Y", f"Daemon already listening on {SOCKET_PATH}"))
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)  # stale socket from a crashed daemon
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(SOCKET_PATH)
+        os.chmod(SOCKET_PATH, 0o600)
+        server.listen(16)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # let finally remove the socket
+        print(self.color_log("G", f"Domina daemon listening on {SOCKET_PATH}"))
+        if self.collector is None:
+            try:
+                self.collector = HeartbeatCollector().bind().start()
+                print(self.color_log("G", f"Heartbeat collector on {self.collector.addr}"))
+            except OSError as e:
+                print(self.color_log("Y", f"Heartbeat collector disabled: {e}"))
+        try:
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    try:
+                        req = json.loads(conn.makefile('rb').readline())
+                        out = io.StringIO()
+                        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                            if req.get("cmd") in DAEMON_COMMANDS:
+                                self.execute(req["cmd"], *req.get("args", []))
+                            else:
+                                print(f"[!] {req.get('cmd')} must run in-process.")
+                        conn.sendall(out.getvalue().encode("utf-8"))
+                    except Exception as e:
+                        conn.sendall(self.color_log("R", f"Daemon error: {e}\n").encode("utf-8"))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            os.unlink(SOCKET_PATH)
+            if self.collector:
+                self.collector.close()
+
     def update_timestamp(self):
         """Global Pulse: Updates the last_updated field for all projects."""
         for f in os.listdir(PROJECTS_DIR):
             if f.endswith(".yml") and f != "playbook.yml":
                 path = os.path.join(PROJECTS_DIR, f)
+                journal.compact(path)
                 data = self._load_yaml(path)
                 if isinstance(data, dict):
                     meta = data.setdefault('project_metadata', {})
@@ -191,5 +587,7 @@ def update_timestamp(self):
 
 if __name__ == "__main__":
     cmd = sys.argv[1] if len(sys.argv) > 1 else "agenda"
-    arg = sys.argv[2] if len(sys.argv) > 2 else None
-    DominaCLI().execute(cmd, arg)
+    if cmd == "serve":
+        DominaCLI(model=WarmModel()).serve()
+    else:
+        DominaCLI().execute(cmd, *sys.argv[2:])
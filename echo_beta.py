@@ -1,38 +1,319 @@
 import shutil
 import time
-import subprocess
 import argparse
+import bisect
+import fcntl
 import json
+import glob
+import mmap
 import os
+import struct
 import yaml
 from datetime import datetime, timedelta
 
+SCOUT_MARKER = b'agent_mark2_venv'
+RING_PATH = os.path.expanduser("~/data/vitals.ring")
+RING_SLOTS = 8640  # 24h at the default 10s cadence
+# Header: magic, capacity, total records ever written. Slot = total % capacity.
+RING_HEADER = struct.Struct('<8sIQ')
+# Record: timestamp, load1, temp C (NaN if no sensor), disk used %, scout active
+RING_RECORD = struct.Struct('<dfffB3x')
+RING_MAGIC = b'VITALS01'
+# Nap is refused if the scout showed up in the ring during this many trailing minutes
+NAP_QUIET_MINUTES = 10
+POWER_PATH = os.path.expanduser("~/data/power_history.log")
+LEGACY_POWER_PATH = os.path.expanduser("~/data/power_history.yml")
+POWER_HEADER = struct.Struct('<8s')
+# Record: timestamp, kind, planned seconds, intended wake (NaN for wake events).
+# Appends are time-ordered, so the timestamp column doubles as the index.
+POWER_RECORD = struct.Struct('<dB3xId')
+POWER_MAGIC = b'POWER001'
+POWER_KINDS = {1: 'sleep', 2: 'wake'}
+# Sensor chips worth preferring over whatever hwmon0 happens to be
+PREFERRED_CHIPS = ('k10temp', 'coretemp', 'zenpower', 'cpu_thermal', 'acpitz')
+_SENSOR_CACHE = None
+
+def find_scout():
+    """Pids whose cmdline mentions the scout venv, read straight from /proc (no pgrep fork)."""
+    me, pids = os.getpid(), []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit() or int(entry) == me:
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                if SCOUT_MARKER in f.read():
+                    pids.append(int(entry))
+        except OSError:
+            continue  # process exited mid-scan, or not ours to read
+    return pids
+
+def discover_sensors():
+    """temp*_input files across every hwmon chip, preferred chips first. Cached per process."""
+    global _SENSOR_CACHE
+    if _SENSOR_CACHE is None:
+        found = []
+        for path in sorted(glob.glob('/sys/class/hwmon/hwmon*/temp*_input')):
+            try:
+                with open(os.path.join(os.path.dirname(path), 'name')) as f:
+                    chip = f.read().strip()
+            except OSError:
+                chip = ''
+            rank = PREFERRED_CHIPS.index(chip) if chip in PREFERRED_CHIPS else len(PREFERRED_CHIPS)
+            found.append((rank, chip, path))
+        _SENSOR_CACHE = [(chip, path) for _, chip, path in sorted(found)]
+    return _SENSOR_CACHE
+
+def read_temp():
+    """Hottest reading from the best-ranked chip, in C; None when the box exposes no sensors."""
+    sensors = discover_sensors()
+    if not sensors:
+        return None
+    best_chip = sensors[0][0]
+    readings = []
+    for chip, path in sensors:
+        if chip != best_chip:
+            break
+        try:
+            with open(path) as f:
+                readings.append(int(f.read().strip()) / 1000)
+        except (OSError, ValueError):
+            continue
+    return max(readings) if readings else None
+
+def sample():
+    """One fork-free reading of load, temperature, disk and scout activity."""
+    with open('/proc/loadavg', 'r') as f:
+        load = f.read().split()[:3]
+    total, used, free = shutil.disk_usage("/")
+    return {
+        "ts": time.time(),
+        "load": load,
+        "temp_c": read_temp(),
+        "disk": (total, used, free),
+        "scout_active": bool(find_scout())
+    }
+
+class VitalsRing:
+    """Fixed-size on-disk ring of vitals samples; the sampler writes, anyone can query."""
+    def __init__(self, path=RING_PATH, capacity=RING_SLOTS):
+        self.path = path
+        size = RING_HEADER.size + capacity * RING_RECORD.size
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.ftruncate(fd, size)
+                os.pwrite(fd, RING_HEADER.pack(RING_MAGIC, capacity, 0), 0)
+            self.mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        magic, self.capacity, _ = RING_HEADER.unpack_from(self.mm, 0)
+        if magic != RING_MAGIC:
+            raise ValueError(f"{path} is not a vitals ring")
+
+    def append(self, ts, load1, temp_c, disk_pct, scout):
+        _, _, total = RING_HEADER.unpack_from(self.mm, 0)
+        offset = RING_HEADER.size + (total % self.capacity) * RING_RECORD.size
+        temp = float('nan') if temp_c is None else temp_c
+        RING_RECORD.pack_into(self.mm, offset, ts, load1, temp, disk_pct, int(scout))
+        # Publish the record only after it is fully written
+        RING_HEADER.pack_into(self.mm, 0, RING_MAGIC, self.capacity, total + 1)
+
+    def window(self, seconds):
+        """Records newer than now - seconds, oldest first."""
+        _, _, total = RING_HEADER.unpack_from(self.mm, 0)
+        cutoff = time.time() - seconds
+        out = []
+        # Walk backwards from the newest slot until we leave the window
+        for n in range(total - 1, max(total - self.capacity, 0) - 1, -1):
+            rec = RING_RECORD.unpack_from(self.mm, RING_HEADER.size + (n % self.capacity) * RING_RECORD.size)
+            if rec[0] < cutoff:
+                break
+            out.append(rec)
+        out.reverse()
+        return out
+
+def _stats(values):
+    """min/max/p95 (nearest rank) plus the newest reading; NaN (no sensor) is ignored."""
+    values = [v for v in values if v == v]
+    if not values:
+        return None
+    ordered = sorted(values)
+    p95 = ordered[max(0, -(-95 * len(ordered) // 100) - 1)]
+    return {"min": round(ordered[0], 2), "max": round(ordered[-1], 2),
+            "p95": round(p95, 2), "last": round(values[-1], 2)}
+
+def trend(minutes, ring=None):
+    """min/max/p95 of each metric over the last N minutes of sampler history."""
+    if ring is None and not os.path.exists(RING_PATH):
+        # A query must not create the ring: that is the sampler's job
+        return {"minutes": minutes, "samples": 0, "status": "no samples"}
+    records = (ring or VitalsRing()).window(minutes * 60)
+    summary = {"minutes": minutes, "samples": len(records)}
+    if records:
+        summary["load1"] = _stats([r[1] for r in records])
+        summary["temp_c"] = _stats([r[2] for r in records])
+        summary["disk_pct"] = _stats([r[3] for r in records])
+        summary["scout_active_pct"] = round(100 * sum(r[4] for r in records) / len(records), 1)
+    return summary
+
+def run_sampler(interval=10, ring=None):
+    """--sample daemon: one fork-free reading every `interval` seconds into the ring."""
+    ring = ring or VitalsRing()
+    while True:
+        v = sample()
+        total, used, _ = v["disk"]
+        ring.append(v["ts"], float(v["load"][0]), v["temp_c"], used / total * 100, v["scout_active"])
+        time.sleep(interval)
+
+class _Column:
+    """Read-only sequence over one field of the power log, so bisect can search the mmap directly."""
+    def __init__(self, history, n):
+        self.history, self.n = history, n
+
+    def __len__(self):
+        return len(self.history)
+
+    def __getitem__(self, i):
+        return self.history.record(i)[self.n]
+
+class PowerHistory:
+    """Append-only fixed-width log of sleep/wake events, searched by binary search on time."""
+    def __init__(self, path=POWER_PATH, legacy=LEGACY_POWER_PATH):
+        self.path = path
+        self.mm = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(POWER_HEADER.pack(POWER_MAGIC))
+            if legacy and os.path.exists(legacy):
+                import_legacy(legacy, self)
+        self._remap()
+
+    def _remap(self):
+        if self.mm is not None:
+            self.mm.close()  # The old view is superseded; don't leak one mapping per append
+            self.mm = None
+        with open(self.path, 'rb') as f:
+            if POWER_HEADER.unpack(f.read(POWER_HEADER.size))[0] != POWER_MAGIC:
+                raise ValueError(f"{self.path} is not a power history log")
+            size = os.fstat(f.fileno()).st_size
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > POWER_HEADER.size else None
+        self.count = (size - POWER_HEADER.size) // POWER_RECORD.size  # ignores a torn tail
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        return POWER_RECORD.unpack_from(self.mm, POWER_HEADER.size + i * POWER_RECORD.size)
+
+    def append(self, ts, kind, seconds=0, intended_wake=None):
+        self.extend([(ts, kind, seconds, intended_wake)])
+
+    def extend(self, rows):
+        """Appends (ts, kind, seconds, intended_wake) rows under an exclusive flock."""
+        blob = b''.join(POWER_RECORD.pack(ts, kind, seconds, float('nan') if wake is None else wake)
+                        for ts, kind, seconds, wake in rows)
+        with open(self.path, 'r+b') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(f.fileno()).st_size
+                # Drop a torn record from a crashed writer so the table stays aligned
+                end = size - (size - POWER_HEADER.size) % POWER_RECORD.size
+                f.truncate(end)
+                f.seek(end)
+                f.write(blob)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self._remap()
+
+    def last(self):
+        return self.record(self.count - 1) if self.count else None
+
+    def range(self, start, end):
+        """Records with start <= ts < end, oldest first. Two bisects, then a contiguous slice."""
+        ts = _Column(self, 0)
+        lo, hi = bisect.bisect_left(ts, start), bisect.bisect_left(ts, end)
+        return [self.record(i) for i in range(lo, hi)]
+
+    def naps(self, start, end):
+        """(slept_at, planned seconds, intended wake, actual wake or None) for sleeps in range.
+        A nap's wake is the next record, if that record is a wake."""
+        ts = _Column(self, 0)
+        lo, hi = bisect.bisect_left(ts, start), bisect.bisect_left(ts, end)
+        out = []
+        for i in range(lo, hi):
+            rec = self.record(i)
+            if POWER_KINDS.get(rec[1]) != 'sleep':
+                continue
+            nxt = self.record(i + 1) if i + 1 < self.count else None
+            woke = nxt[0] if nxt and POWER_KINDS.get(nxt[1]) == 'wake' else None
+            out.append((rec[0], rec[2], rec[3], woke))
+        return out
+
+def import_legacy(yml_path, history):
+    """One-shot import of the old concatenated-YAML history; the YAML is kept as *.migrated."""
+    with open(yml_path, 'r') as f:
+        entries = yaml.safe_load(f) or []
+    rows = []
+    for e in entries:
+        try:
+            ts = datetime.fromisoformat(e['timestamp']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            continue
+        wake = e.get('intended_wake')
+        rows.append((ts, 1 if e.get('event', 'sleep') == 'sleep' else 2, int(e.get('duration_seconds') or 0),
+                     datetime.fromisoformat(wake).timestamp() if wake else None))
+    history.extend(sorted(rows, key=lambda r: r[0]))
+    os.replace(yml_path, yml_path + ".migrated")
+    return len(rows)
+
+def record_wake(history=None):
+    """Boot hook (--woke): logs the kernel boot time as the actual wake, once per boot.
+    Skipped when the log already holds anything at or after that boot, keeping it time-ordered."""
+    history = PowerHistory() if history is None else history
+    with open('/proc/stat', 'r') as f:
+        btime = next(float(line.split()[1]) for line in f if line.startswith('btime'))
+    last = history.last()
+    if last and last[0] >= btime:
+        return None
+    history.append(btime, 2)
+    return btime
+
+def power_stats(start, end, history=None):
+    """Total sleep, wake-punctuality drift and events/day between two datetimes."""
+    history = PowerHistory() if history is None else history
+    t0, t1 = start.timestamp(), end.timestamp()
+    naps = history.naps(t0, t1)
+    slept = sum((woke if woke else at + planned) - at for at, planned, _, woke in naps)
+    drift = [woke - intended for _, _, intended, woke in naps if woke and intended == intended]
+    per_day = {}
+    for rec in history.range(t0, t1):
+        day = datetime.fromtimestamp(rec[0]).strftime('%Y-%m-%d')
+        per_day[day] = per_day.get(day, 0) + 1
+    return {
+        "from": start.strftime('%Y-%m-%d'), "to": end.strftime('%Y-%m-%d'),
+        "naps": len(naps),
+        "sleep_hours": round(slept / 3600, 2),
+        "woke_unrecorded": sum(1 for n in naps if n[3] is None),
+        "wake_drift_s": {"mean": round(sum(drift) / len(drift), 1), "max": round(max(drift, key=abs), 1)} if drift else None,
+        "events_per_day": per_day
+    }
+
 def get_vitals():
     try:
-        # Load Average
-        with open('/proc/loadavg', 'r') as f:
-            load = f.read().split()[:3]
-        
-        # CPU Temp
-        with open('/sys/class/hwmon/hwmon0/temp2_input', 'r') as f:
-            temp_c = int(f.read().strip()) // 1000
-            
-        # Disk Space (The 1TB Library)
-        total, used, free = shutil.disk_usage("/")
-        
-        # Sentinel Check
-        is_busy = subprocess.call(['pgrep', '-f', 'agent_mark2_venv'], stdout=subprocess.DEVNULL) == 0
-        
+        v = sample()
+        total, used, free = v["disk"]
         vitals = {
-            "temp": f"{temp_c}°C",
-            "load": load,
+            "temp": f"{v['temp_c']:.0f}°C" if v["temp_c"] is not None else "N/A",
+            "load": v["load"],
             "disk": {
                 "total": f"{total // (2**30)}GB",
                 "used": f"{used // (2**30)}GB",
                 "free": f"{free // (2**30)}GB",
                 "percent": f"{(used/total)*100:.1f}%"
             },
-            "scout_active": is_busy
+            "scout_active": v["scout_active"]
         }
         print(json.dumps(vitals, indent=4))
     except Exception as e:
@@ -43,28 +324,23 @@ def prime_wol():
     os.system("sudo ethtool -s $(ip route | grep default | awk '{print $5}') wol g")
 
 def initiate_nap(seconds, force=False):
-    # 1. Sentinel Safety Check
-    is_busy = subprocess.call(['pgrep', '-f', 'agent_mark2_venv'], stdout=subprocess.DEVNULL) == 0
-    
+    # 1. Sentinel Safety Check (now, and across the sampler's recent history if it is running)
+    is_busy = bool(find_scout())
+    recent = trend(NAP_QUIET_MINUTES) if os.path.exists(RING_PATH) else {}
+
     if is_busy and not force:
         print(json.dumps({"status": "rejected", "reason": "Scout active in .venv. Use --force to override."}))
         return
+    if recent.get("scout_active_pct") and not force:
+        print(json.dumps({"status": "rejected",
+                          "reason": f"Scout active in {recent['scout_active_pct']}% of the last {NAP_QUIET_MINUTES} min. Use --force to override."}))
+        return
 
     # 2. Persistence (The Scrolls)
-    wake_time = datetime.now() + timedelta(seconds=seconds)
-    log_entry = {
-        'event': 'sleep',
-        'timestamp': datetime.now().isoformat(),
-        'intended_wake': wake_time.isoformat(),
-        'duration_seconds': seconds
-    }
-    
-    log_path = os.path.expanduser("~/data/power_history.yml")
+    now = datetime.now()
+    wake_time = now + timedelta(seconds=seconds)
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, 'a') as f:
-            yaml.dump([log_entry], f, default_flow_style=False)
+        PowerHistory().append(now.timestamp(), 1, seconds, wake_time.timestamp())
     except Exception as e:
         # Don't let a log failure stop the shutdown, but report it
         pass
@@ -91,11 +367,29 @@ if __name__ == "__main__":
     parser.add_argument('--vitals', action='store_true', help="Get hardware health (JSON)")
     parser.add_argument('--nap', type=int, help="Seconds until next wake-up")
     parser.add_argument('--force', action='store_true', help="Force nap even if busy")
+    parser.add_argument('--sample', type=int, nargs='?', const=10, metavar='SECONDS',
+                        help="Run the vitals sampler daemon (default every 10s)")
+    parser.add_argument('--trend', type=int, metavar='MINUTES', help="min/max/p95 over the last N minutes (JSON)")
+    parser.add_argument('--woke', action='store_true', help="Record this boot as the actual wake (run at boot)")
+    parser.add_argument('--power-stats', action='store_true', help="Sleep/drift/events-per-day summary (JSON)")
+    parser.add_argument('--from', dest='start', help="YYYY-MM-DD (default: 30 days ago)")
+    parser.add_argument('--to', dest='end', help="YYYY-MM-DD, exclusive (default: tomorrow)")
     
     args = parser.parse_args()
 
     if args.vitals:
         get_vitals()
+    elif args.sample:
+        run_sampler(args.sample)
+    elif args.trend:
+        print(json.dumps(trend(args.trend), indent=4))
+    elif args.woke:
+        btime = record_wake()
+        print(json.dumps({"status": "recorded" if btime else "already_recorded", "woke_at": btime}))
+    elif args.power_stats:
+        end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else end - timedelta(days=30)
+        print(json.dumps(power_stats(start, end), indent=4))
     elif args.nap is not None:
         initiate_nap(args.nap, args.force)
     else:
@@ -1,47 +1,168 @@
 import yaml
 import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import Future, TimeoutError
 from mastodon import Mastodon
 from atproto import Client
 
+# Per-platform budget (seconds) for the whole check, login included
+PLATFORM_TIMEOUTS = {"mastodon": 10, "bluesky": 15}
+# Bluesky session strings are reused until this old; createSession is heavily rate limited
+SESSION_CACHE = os.path.expanduser("~/.cache/handshake_sessions.json")
+BLUESKY_SESSION_TTL = 24 * 3600
+
 # --- THE VAULT BRIDGE ---
-def load_vault(vault_path="api_credentials.yml"):
+def load_vault(vault_path="api_credentials.yml", quiet=False):
     if not os.path.exists(vault_path):
-        print(f"❌ Error: {vault_path} not found!")
+        if not quiet:
+            print(f"❌ Error: {vault_path} not found!")
         return False
     with open(vault_path, 'r') as f:
         creds = yaml.safe_load(f)
         for k, v in creds.items():
             os.environ[k] = str(v)
-    print("🔓 Vault loaded into environment.")
+    if not quiet:
+        print("🔓 Vault loaded into environment.")
     return True
 
-def verify_combat_readiness():
-    if not load_vault():
-        return
-    
-    print("🛡️ Testing Regenerated Credentials...")
-
-    # Test Mastodon
+# --- SESSION CACHE ---
+def load_sessions(path=SESSION_CACHE):
     try:
-        m = Mastodon(
-            access_token=os.getenv("MASTODON_ACCESS_TOKEN"), 
-            api_base_url=os.getenv("MASTODON_API_BASE_URL")
-        )
-        user = m.account_verify_credentials()
-        print(f"🐘 Mastodon: SUCCESS (Verified as @{user['username']})")
-    except Exception as e:
-        print(f"❌ Mastodon: FAIL - {e}")
-
-    # Test Bluesky
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_sessions(sessions, path=SESSION_CACHE):
+    """Atomic, owner-only: the file holds live tokens."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(sessions, f)
+    os.replace(tmp, path)
+
+# --- PLATFORM CHECKS ---
+def check_mastodon(sessions, timeout):
+    """Access tokens do not expire, so there is nothing to cache: one verify call."""
+    m = Mastodon(
+        access_token=os.getenv("MASTODON_ACCESS_TOKEN"),
+        api_base_url=os.getenv("MASTODON_API_BASE_URL"),
+        request_timeout=timeout
+    )
+    user = m.account_verify_credentials()
+    return f"@{user['username']}", "token"
+
+def check_bluesky(sessions, timeout):
+    """Resumes the cached session when it is fresh; falls back to a password login."""
+    handle = os.getenv("BLUESKY_HANDLE")
+    cached = sessions.get("bluesky")
+    client = Client(base_url=os.getenv("BLUESKY_BASE_URL") or None)
+    source = "fresh"
+    if cached and cached.get("handle") == handle and time.time() - cached.get("created", 0) < BLUESKY_SESSION_TTL:
+        try:
+            client.login(session_string=cached["session"])
+            source = "cached"
+        except Exception:
+            pass  # Revoked or expired server-side: log in from scratch below
+    if source == "fresh":
+        client.login(handle, os.getenv("BLUESKY_APP_PASSWORD"))
+        sessions["bluesky"] = {"handle": handle, "session": client.export_session_string(), "created": time.time()}
+        save_sessions(sessions)
+    return handle, source
+
+CHECKS = {"mastodon": check_mastodon, "bluesky": check_bluesky}
+
+def _timed(check, sessions, timeout):
+    """Runs one check, returning (identity, session source, own latency in ms)."""
+    t0 = time.perf_counter()
+    identity, source = check(sessions, timeout)
+    return identity, source, round((time.perf_counter() - t0) * 1000, 1)
+
+def _spawn(fn, *args):
+    """fn(*args) on a daemon thread, as a Future. atproto takes no request timeout, so a hung
+    check cannot be cancelled; a daemon thread at least never holds up interpreter exit."""
+    future = Future()
+    def runner():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+    threading.Thread(target=runner, daemon=True).start()
+    return future
+
+def verify_combat_readiness(vault_path="api_credentials.yml", as_json=False, timeouts=None):
+    """Runs every platform check at once; each gets its own deadline. Returns True if all pass."""
+    if not load_vault(vault_path, quiet=as_json):
+        if as_json:
+            print(json.dumps({"ok": False, "error": f"{vault_path} not found"}))
+        return False
+    timeouts = {**PLATFORM_TIMEOUTS, **(timeouts or {})}
+    sessions = load_sessions()
+
+    if not as_json:
+        print("🛡️ Testing Regenerated Credentials...")
+
+    started = time.perf_counter()
+    futures = {name: _spawn(_timed, check, sessions, timeouts[name]) for name, check in CHECKS.items()}
+    results = []
+    for name, future in futures.items():
+        remaining = max(0.0, started + timeouts[name] - time.perf_counter())
+        entry = {"platform": name, "ok": False}
+        try:
+            entry["identity"], entry["session"], entry["latency_ms"] = future.result(timeout=remaining)
+            entry["ok"] = True
+        except TimeoutError:
+            entry["error"] = f"timed out after {timeouts[name]}s"
+        except Exception as e:
+            entry["error"] = str(e)
+        entry.setdefault("latency_ms", round((time.perf_counter() - started) * 1000, 1))
+        results.append(entry)
+
+    ok = all(r["ok"] for r in results)
+    if as_json:
+        print(json.dumps({"ok": ok, "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+                          "platforms": results}, indent=4))
+    else:
+        icons = {"mastodon": "🐘 Mastodon", "bluesky": "🦋 Bluesky"}
+        for r in results:
+            if r["ok"]:
+                print(f"{icons[r['platform']]}: SUCCESS (Verified as {r['identity']}, {r['session']} session, {r['latency_ms']}ms)")
+            else:
+                print(f"❌ {icons[r['platform']]}: FAIL - {r['error']}")
+    return ok
+
+def timeout_arg(text):
+    """'SECONDS' for every platform, or 'PLATFORM=SECONDS' for one."""
+    name, sep, value = text.rpartition('=')
     try:
-        client = Client()
-        client.login(os.getenv("BLUESKY_HANDLE"), os.getenv("BLUESKY_APP_PASSWORD"))
-        print(f"🦋 Bluesky: SUCCESS (Verified as {os.getenv('BLUESKY_HANDLE')})")
-    except Exception as e:
-        print(f"❌ Bluesky: FAIL - {e}")
+        seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number of seconds: {value!r}")
+    if sep and name not in PLATFORM_TIMEOUTS:
+        raise argparse.ArgumentTypeError(f"unknown platform {name!r} (one of {', '.join(PLATFORM_TIMEOUTS)})")
+    return {name: seconds} if sep else dict.fromkeys(PLATFORM_TIMEOUTS, seconds)
 
 if __name__ == "__main__":
-    verify_combat_readiness()
+    parser = argparse.ArgumentParser(description="Verify platform credentials from the vault")
+    parser.add_argument('--vault', default="api_credentials.yml", help="Credentials YAML")
+    parser.add_argument('--json', action='store_true', help="Per-platform latency summary as JSON")
+    parser.add_argument('--timeout', action='append', default=[], type=timeout_arg, metavar='[PLATFORM=]SECONDS',
+                        help="Override every deadline, or one platform's (repeatable; later wins)")
+    parser.add_argument('--debug', action='store_true', help="Show which handle/URL the vault resolved to")
+    args = parser.parse_args()
+
+    overrides = {}
+    for override in args.timeout:
+        overrides.update(override)
+    ok = verify_combat_readiness(args.vault, args.json, overrides)
 
-print(f"DEBUG: Using Handle -> {os.getenv('BLUESKY_HANDLE')}")
-print(f"DEBUG: Using Mastodon URL -> {os.getenv('MASTODON_API_BASE_URL')}")
\ No newline at end of file
+    if args.debug:
+        print(f"DEBUG: Using Handle -> {os.getenv('BLUESKY_HANDLE')}")
+        print(f"DEBUG: Using Mastodon URL -> {os.getenv('MASTODON_API_BASE_URL')}")
+    sys.exit(0 if ok else 1)
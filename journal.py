@@ -0,0 +1,124 @@
+import os
+import json
+import fcntl
+import yaml
+
+# Dual-Track Memory limits (mirrors the YAML layout under logs:)
+FIFO_LIMIT = 150
+# Fold the journal back into the YAML once it grows past this many bytes
+COMPACT_BYTES = 32 * 1024
+
+def journal_path(project_path):
+    """painter.yml -> painter.journal (sits next to the project file)."""
+    base = project_path[:-4] if project_path.endswith(".yml") else project_path
+    return base + ".journal"
+
+def heads(projects_dir, skip=("playbook.yml",)):
+    """Every head in the directory: each <name>.yml, plus <name>.yml for a journal whose
+    YAML does not exist yet (targets that have only ever been logged to)."""
+    names = set()
+    for f in os.listdir(projects_dir):
+        if f.endswith(".yml"):
+            names.add(f)
+        elif f.endswith(".journal"):
+            names.add(f[:-len(".journal")] + ".yml")
+    return [os.path.join(projects_dir, f) for f in sorted(names - set(skip))]
+
+def append(project_path, ts, task, status, msg, pinned=False):
+    """O(1) event write: one JSON line under an exclusive flock. Returns journal size."""
+    line = json.dumps({"ts": ts, "task": task, "status": status, "msg": msg, "pinned": pinned})
+    with open(journal_path(project_path), 'a', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(line + "\n")
+            f.flush()
+            return f.tell()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _parse(lines):
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue  # torn tail from a crashed writer
+    return events
+
+def read(project_path):
+    """All pending (not yet compacted) events, oldest first."""
+    try:
+        with open(journal_path(project_path), 'r', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                return _parse(f)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    except FileNotFoundError:
+        return []
+
+def apply_event(data, event):
+    """Same semantics log_event always had: FIFO for routine, pinning for R/urgent."""
+    meta = data.setdefault('project_metadata', {})
+    meta['status'] = event['status']
+    meta['last_updated'] = event['ts']
+
+    entry = {"ts": event['ts'], "task": event['task'], "status": event['status'], "msg": event['msg']}
+    logs = data.setdefault('logs', {})
+
+    if event.get('pinned'):
+        logs.setdefault('pinned', []).append(entry)
+        meta['alert_msg'] = event['msg']
+    else:
+        fifo = logs.setdefault('fifo', [])
+        fifo.append(entry)
+        logs['fifo'] = fifo[-FIFO_LIMIT:]
+    return data
+
+def overlay(data, project_path):
+    """Read-through view: the YAML snapshot plus whatever the journal holds."""
+    if not isinstance(data, dict):
+        return data
+    for event in read(project_path):
+        apply_event(data, event)
+    return data
+
+def compact(project_path):
+    """Folds the journal into the project YAML and truncates it. Returns events folded.
+
+    Holds the journal's exclusive lock for the whole fold so concurrent appends
+    wait instead of landing in a journal that is about to be truncated.
+    """
+    jpath = journal_path(project_path)
+    if not os.path.exists(jpath):
+        return 0
+
+    with open(jpath, 'r+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            events = _parse(f)
+            if not events:
+                return 0
+
+            data = None
+            if os.path.exists(project_path):
+                with open(project_path, 'r') as y:
+                    data = yaml.safe_load(y)
+            if data is None:
+                data = {}  # First fold for a journal-only head creates its YAML
+            if not isinstance(data, dict):
+                return 0  # Malformed YAML: keep the journal, it is the only good copy
+
+            for event in events:
+                apply_event(data, event)
+
+            tmp = project_path + ".tmp"
+            with open(tmp, 'w') as y:
+                yaml.dump(data, y, sort_keys=False)
+            os.replace(tmp, project_path)
+
+            f.seek(0)
+            f.truncate()
+            return len(events)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -1,19 +1,29 @@
 import yaml
 import os
+import json
+import time
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 PROJ_ROOT = "/data/projects"
 REPORT_ROOT = "/data/reports"
+MANIFEST_NAME = "ledger_manifest.json"
+# Bump whenever generate_html/audit_metrics output changes so every fragment rebuilds
+GENERATOR_VERSION = "1"
 
 class CoreLedger:
     def __init__(self):
         os.makedirs(PROJ_ROOT, exist_ok=True)
         os.makedirs(REPORT_ROOT, exist_ok=True)
 
-    def load_project(self, name):
+    def _project_path(self, name):
         filename = name if name.endswith(".yml") else f"{name}.yml"
-        path = os.path.join(PROJ_ROOT, filename)
+        return os.path.join(PROJ_ROOT, filename)
+
+    def load_project(self, name):
+        path = self._project_path(name)
         if not os.path.exists(path):
             return None
         with open(path, "r", encoding="utf-8") as f:
@@ -60,15 +70,121 @@ class CoreLedger:
         if fragment_only: return content
         return f"<html><body>{content}</body></html>"
 
-    def run_update(self, name):
-        data = self.load_project(name)
-        if not data: return print(f"NOT_FOUND|{name}")
+    def load_manifest(self):
+        """{'generator': version, 'projects': {name: sha256 of source YAML}}"""
+        try:
+            with open(os.path.join(REPORT_ROOT, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("generator") != GENERATOR_VERSION:
+            return {"generator": GENERATOR_VERSION, "projects": {}}
+        return manifest
+
+    def save_manifest(self, manifest):
+        path = os.path.join(REPORT_ROOT, MANIFEST_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    def audit_one(self, name, known_digest=None, force=False):
+        """load -> audit -> fragment for one project.
+
+        Returns (status line, seconds, source digest). Skips the rebuild when the
+        YAML hashes to known_digest and its fragment is still on disk.
+        """
+        start = time.perf_counter()
+        path = self._project_path(name)
+        if not os.path.exists(path):
+            return f"NOT_FOUND|{name}", time.perf_counter() - start, None
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        frag_path = os.path.join(REPORT_ROOT, f"{name}.frag.html")
+        if not force and digest == known_digest and os.path.exists(frag_path):
+            return f"AUDIT_SKIPPED|{name}|unchanged", time.perf_counter() - start, digest
+
+        data = yaml.safe_load(raw)
+        if not data:
+            return f"NOT_FOUND|{name}", time.perf_counter() - start, None
         overall, focus = self.audit_metrics(data)
-        with open(os.path.join(REPORT_ROOT, f"{name}.frag.html"), "w", encoding="utf-8") as f:
-            f.write(self.generate_html(data, overall, focus, True))
-        print(f"AUDIT_SUCCESS|{name}|{overall}%")
+        html = self.generate_html(data, overall, focus, True)
+        # Swap in whole: a half-written fragment would pass the digest check next run
+        with open(frag_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(frag_path + ".tmp", frag_path)
+        return f"AUDIT_SUCCESS|{name}|{overall}%", time.perf_counter() - start, digest
+
+    def _record(self, manifest, name, line, digest):
+        if line.startswith(("AUDIT_SUCCESS", "AUDIT_SKIPPED")):
+            manifest["projects"][name] = digest
+        else:
+            manifest["projects"].pop(name, None)
+
+    def run_update(self, name, force=False):
+        manifest = self.load_manifest()
+        line, _, digest = self.audit_one(name, manifest["projects"].get(name), force)
+        self._record(manifest, name, line, digest)
+        self.save_manifest(manifest)
+        print(line)
+
+    def is_project(self, name):
+        """A project head is a mapping with a project_metadata block. Playbook, the Cerberus
+        quarter files, the master schedule and list-shaped files like library.yml are not."""
+        try:
+            data = self.load_project(name)
+        except (OSError, yaml.YAMLError):
+            return True  # Let the audit itself report the broken file
+        return isinstance(data, dict) and isinstance(data.get("project_metadata"), dict)
+
+    def discover(self):
+        """Every project head under PROJ_ROOT."""
+        return sorted(f[:-4] for f in os.listdir(PROJ_ROOT)
+                      if f.endswith(".yml") and f != "playbook.yml" and self.is_project(f))
+
+    def run_batch(self, names, workers=None, force=False):
+        """Audits many projects in one interpreter, fanned out over a process pool."""
+        workers = min(workers or os.cpu_count() or 1, len(names)) or 1
+        manifest = self.load_manifest()
+        known = [manifest["projects"].get(n) for n in names]
+        counts = {"rebuilt": 0, "skipped": 0}
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() keeps output in request order regardless of finish order
+            results = pool.map(_audit_worker, names, known, [force] * len(names))
+            for name, (line, elapsed, digest) in zip(names, results):
+                self._record(manifest, name, line, digest)
+                if line.startswith("AUDIT_SUCCESS"): counts["rebuilt"] += 1
+                elif line.startswith("AUDIT_SKIPPED"): counts["skipped"] += 1
+                print(line)
+                print(f"AUDIT_TIME|{name}|{elapsed * 1000:.1f}ms")
+        # Manifest is only written here, by the parent, so workers never race on it
+        self.save_manifest(manifest)
+        print(f"BATCH_DONE|{len(names)}|{workers} workers|{(time.perf_counter() - start) * 1000:.1f}ms")
+        print(f"BATCH_SUMMARY|rebuilt={counts['rebuilt']}|skipped={counts['skipped']}")
+
+def _audit_worker(name, known_digest, force):
+    # Top-level so the process pool can pickle it
+    start = time.perf_counter()
+    try:
+        return CoreLedger().audit_one(name, known_digest, force)
+    except Exception as e:
+        return f"AUDIT_FAILED|{name}|{e}", time.perf_counter() - start, None
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--project", required=True)
-    CoreLedger().run_update(parser.parse_args().project)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--project")
+    target.add_argument("--projects", help="Comma-separated project names")
+    target.add_argument("--all", action="store_true", help="Audit every project under PROJ_ROOT")
+    parser.add_argument("--workers", type=int, help="Pool size (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="Rebuild fragments even if the source is unchanged")
+    args = parser.parse_args()
+
+    ledger = CoreLedger()
+    if args.project:
+        ledger.run_update(args.project, args.force)
+    else:
+        names = ledger.discover() if args.all else [n.strip() for n in args.projects.split(",") if n.strip()]
+        ledger.run_batch(names, args.workers, args.force)
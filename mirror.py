@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import stat
+import shlex
+import fnmatch
+import hashlib
+import argparse
+import tarfile
+import subprocess
+
+MANIFEST_NAME = ".mirror_manifest.json"
+TMP_SUFFIX = ".mirror-tmp"
+# How the far end of an ssh sync invokes this same module
+REMOTE_CMD = os.environ.get("MIRROR_REMOTE_CMD", "python3 ~/agents/mirror.py")
+
+# --- Manifests -------------------------------------------------------------
+
+def _excluded(rel, excludes):
+    name = os.path.basename(rel)
+    if name == MANIFEST_NAME or name.endswith(TMP_SUFFIX):
+        return True
+    return any(fnmatch.fnmatch(rel, pat) or fnmatch.fnmatch(name, pat) for pat in excludes)
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _tree_digest(files):
+    h = hashlib.sha256()
+    for rel in sorted(files):
+        h.update(f"{rel}\0{files[rel][2]}\0{files[rel][3]}\n".encode())
+    return h.hexdigest()
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "digest": None}
+
+def save_manifest(root, manifest):
+    path = os.path.join(root, MANIFEST_NAME)
+    with open(path + TMP_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(path + TMP_SUFFIX, path)
+
+def scan(root, excludes=(), save=True):
+    """Stat walk of root -> {rel: [size, mtime_ns, sha256, mode]}. Files whose (size, mtime_ns)
+    match the stored manifest keep their hash; only new or touched files are re-read. Returns the fresh manifest, which
+    is written back unless save=False (dry runs leave both trees untouched)."""
+    prev = load_manifest(root).get("files", {})
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [d for d in dirnames
+                       if not _excluded(os.path.normpath(os.path.join(rel_dir, d)), excludes)]
+        for name in filenames:
+            rel = os.path.normpath(os.path.join(rel_dir, name))
+            if _excluded(rel, excludes):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = prev.get(rel)
+            mode = stat.S_IMODE(st.st_mode)
+            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                files[rel] = old[:3] + [mode]  # a chmod alone does not need a re-hash
+            else:
+                files[rel] = [st.st_size, st.st_mtime_ns, _sha256(path), mode]
+    manifest = {"files": files, "digest": _tree_digest(files)}
+    if save and manifest != load_manifest(root):
+        save_manifest(root, manifest)
+    return manifest
+
+def diff(src, dst, update=False, delete=False):
+    """(files to copy, files to delete). update=True keeps receiver files that are newer."""
+    copy, remove = [], []
+    for rel, entry in src["files"].items():
+        mtime_ns, sha = entry[1], entry[2]
+        theirs = dst["files"].get(rel)
+        # Slices: a far end still on the 3-field manifest just counts as a mode mismatch
+        if theirs and theirs[2] == sha and theirs[3:4] == entry[3:4]:
+            continue
+        if update and theirs and theirs[1] > mtime_ns:
+            continue
+        copy.append(rel)
+    if delete:
+        remove = [rel for rel in dst["files"] if rel not in src["files"]]
+    return sorted(copy), sorted(remove)
+
+# --- Installing files ------------------------------------------------------
+
+def _safe_target(root, rel):
+    target = os.path.normpath(os.path.join(root, rel))
+    if os.path.isabs(rel) or not target.startswith(os.path.normpath(root) + os.sep):
+        raise ValueError(f"Refusing path outside root: {rel}")
+    return target
+
+def _install_stream(root, rel, stream, mtime, mode):
+    """Writes next to the destination, then swaps it in so readers never see a partial file.
+    Permission bits travel with the content (rsync -a used to keep +x on scripts)."""
+    target = _safe_target(root, rel)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + TMP_SUFFIX
+    with open(tmp, 'wb') as out:
+        for block in iter(lambda: stream.read(1 << 20), b''):
+            out.write(block)
+    os.chmod(tmp, stat.S_IMODE(mode))
+    os.utime(tmp, (mtime, mtime))
+    os.replace(tmp, target)
+
+def install_local(src_root, dst_root, rels):
+    for rel in rels:
+        src = os.path.join(src_root, rel)
+        with open(src, 'rb') as f:
+            st = os.fstat(f.fileno())
+            _install_stream(dst_root, rel, f, st.st_mtime, st.st_mode)
+
+def remove_local(root, rels):
+    for rel in rels:
+        try:
+            os.remove(_safe_target(root, rel))
+        except FileNotFoundError:
+            pass
+
+def send_tar(root, rels, out):
+    """Streams the listed files as an uncompressed tar (the ssh pipe does the work)."""
+    with tarfile.open(fileobj=out, mode='w|') as tar:
+        for rel in rels:
+            tar.add(os.path.join(root, rel), arcname=rel, recursive=False)
+
+def receive_tar(root, stream):
+    count = 0
+    with tarfile.open(fileobj=stream, mode='r|') as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            _install_stream(root, member.name, tar.extractfile(member), member.mtime, member.mode)
+            count += 1
+    return count
+
+# --- Endpoints -------------------------------------------------------------
+
+def _split(spec):
+    """'host:/path' -> ('host', '/path'); '/path' -> (None, '/path')."""
+    head, sep, tail = spec.partition(':')
+    if sep and '/' not in head and not os.path.exists(spec):
+        return head, tail
+    return None, spec
+
+def _remote(host, args, **kw):
+    cmd = f"{REMOTE_CMD} {' '.join(shlex.quote(a) for a in args)}"
+    return subprocess.run(["ssh", host, cmd], check=True, **kw)
+
+def _exclude_args(excludes):
+    return [a for pat in excludes for a in ("--exclude", pat)]
+
+def _remote_manifest(host, root, excludes, dry_run=False):
+    args = ["--manifest", root] + _exclude_args(excludes) + (["--dry-run"] if dry_run else [])
+    return json.loads(_remote(host, args, stdout=subprocess.PIPE).stdout)
+
+def sync(src_spec, dst_spec, excludes=(), update=False, delete=False, dry_run=False):
+    """Delta sync between two roots; at most one side may be host:path (over ssh).
+
+    Returns {"copied": n, "deleted": n, "unchanged": bool}.
+    """
+    src_host, src_root = _split(src_spec)
+    dst_host, dst_root = _split(dst_spec)
+    if src_host and dst_host:
+        raise ValueError("Only one side of a sync can be remote")
+    if not dst_host and not dry_run:
+        os.makedirs(dst_root, exist_ok=True)
+
+    save = not dry_run
+    src_m = _remote_manifest(src_host, src_root, excludes, dry_run) if src_host else scan(src_root, excludes, save)
+    dst_m = _remote_manifest(dst_host, dst_root, excludes, dry_run) if dst_host else scan(dst_root, excludes, save)
+    if src_m["digest"] == dst_m["digest"]:
+        return {"copied": 0, "deleted": 0, "unchanged": True}
+
+    copy, remove = diff(src_m, dst_m, update, delete)
+    if dry_run:
+        for rel in copy: print(f"COPY|{rel}")
+        for rel in remove: print(f"DELETE|{rel}")
+        return {"copied": len(copy), "deleted": len(remove), "unchanged": False}
+
+    if copy:
+        if src_host:  # pull: remote tars, we unpack
+            proc = subprocess.Popen(["ssh", src_host, f"{REMOTE_CMD} --send {shlex.quote(src_root)}"],
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            proc.stdin.write("\n".join(copy).encode())
+            proc.stdin.close()
+            receive_tar(dst_root, proc.stdout)
+            if proc.wait() != 0:
+                raise RuntimeError(f"remote send exited {proc.returncode}")
+        elif dst_host:  # push: we tar, remote unpacks
+            # The far end rescans after unpacking: same excludes, or its manifest would drift
+            args = ["--receive", dst_root] + _exclude_args(excludes)
+            proc = subprocess.Popen(["ssh", dst_host, f"{REMOTE_CMD} {' '.join(shlex.quote(a) for a in args)}"],
+                                    stdin=subprocess.PIPE)
+            send_tar(src_root, copy, proc.stdin)
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"remote receive exited {proc.returncode}")
+        else:
+            install_local(src_root, dst_root, copy)
+
+    if remove:
+        if dst_host:
+            _remote(dst_host, _exclude_args(excludes) + ["--remove", dst_root, *remove])
+        else:
+            remove_local(dst_root, remove)
+
+    if not dst_host:
+        scan(dst_root, excludes)  # only the touched files get re-hashed
+    return {"copied": len(copy), "deleted": len(remove), "unchanged": False}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manifest-based delta sync between two roots")
+    parser.add_argument('src', nargs='?', help="Source root (dir or host:dir)")
+    parser.add_argument('dst', nargs='?', help="Destination root (dir or host:dir)")
+    parser.add_argument('--exclude', action='append', default=[], help="fnmatch pattern (repeatable)")
+    parser.add_argument('--update', '-u', action='store_true', help="Skip files newer on the receiver")
+    parser.add_argument('--delete', action='store_true', help="Remove receiver files missing at source")
+    parser.add_argument('--dry-run', action='store_true')
+    # Far-end plumbing used over ssh
+    parser.add_argument('--manifest', metavar='ROOT', help=argparse.SUPPRESS)
+    parser.add_argument('--send', metavar='ROOT', help=argparse.SUPPRESS)
+    parser.add_argument('--receive', metavar='ROOT', help=argparse.SUPPRESS)
+    parser.add_argument('--remove', nargs='+', metavar='ROOT REL', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.manifest:
+        if not args.dry_run:
+            os.makedirs(args.manifest, exist_ok=True)
+        json.dump(scan(args.manifest, args.exclude, save=not args.dry_run), sys.stdout)
+    elif args.send:
+        rels = [r for r in sys.stdin.read().splitlines() if r]
+        send_tar(args.send, rels, sys.stdout.buffer)
+    elif args.receive:
+        os.makedirs(args.receive, exist_ok=True)
+        receive_tar(args.receive, sys.stdin.buffer)
+        scan(args.receive, args.exclude)
+    elif args.remove:
+        remove_local(args.remove[0], args.remove[1:])
+        scan(args.remove[0], args.exclude)
+    elif args.src and args.dst:
+        result = sync(args.src, args.dst, args.exclude, args.update, args.delete, args.dry_run)
+        state = "UNCHANGED" if result["unchanged"] else ("DRYRUN" if args.dry_run else "SYNCED")
+        print(f"SYNC_{state}|{args.src} -> {args.dst}|copied={result['copied']}|deleted={result['deleted']}")
+    else:
+        parser.print_help()
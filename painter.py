@@ -1,32 +1,131 @@
 import os
+import gzip
+import json
+import time
+import hashlib
+import threading
 import yaml
-from flask import Flask, render_template
-from datetime import datetime
+import journal
+from ceberus import quarter_view, user_days
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
+from datetime import datetime, timezone
 
 PROJECTS_DIR = "/data/projects"
+# SSE watcher cadence: stat pass every POLL_SECONDS, keepalive comment every KEEPALIVE_SECONDS
+POLL_SECONDS = 1.0
+KEEPALIVE_SECONDS = 15
+API_MAX_LIMIT = 500
 app = Flask(__name__)
 
+# Parsed-report cache: path -> (((inode, mtime_ns, size) or None, journal sig), report)
+_REPORT_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+# Rendered page, valid for exactly one project validator
+_RENDERED = {"etag": None, "html": b"", "gzip": b""}
+_RENDER_LOCK = threading.Lock()
+
 # This route is what the browser actually looks at
 @app.route('/')
 def dashboard():
-    results = []
-    for filename in os.listdir(PROJECTS_DIR):
-        if filename.endswith(".yml") and filename != "playbook.yml":
-            report = audit_file(os.path.join(PROJECTS_DIR, filename))
-            results.append(report)
-    return render_template('dashboard.html', reports=results)
+    etag, last_modified = project_validator()
+
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and since >= last_modified
+    if not_modified:
+        resp = Response(status=304)
+    else:
+        html, gz = rendered_page(etag)
+        if request.accept_encodings['gzip']:
+            resp = Response(gz, mimetype='text/html')
+            resp.headers['Content-Encoding'] = 'gzip'
+        else:
+            resp = Response(html, mimetype='text/html')
+
+    resp.set_etag(etag, weak=True)
+    resp.last_modified = last_modified
+    resp.vary.add('Accept-Encoding')
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@app.route('/api/reports')
+def api_reports():
+    """?status=R[,Y]  ?offset=0&limit=100  ?fields=display_name,status"""
+    reports = snapshot()
+    statuses = set(filter(None, request.args.get('status', '').split(',')))
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 0), API_MAX_LIMIT)
+
+    rows = [dict(r, project=name) for name, r in sorted(reports.items())
+            if not statuses or r['status'] in statuses]
+    page = rows[offset:offset + limit]
+    if fields:
+        page = [{k: r[k] for k in ['project', *fields] if k in r} for r in page]
+    return jsonify({"total": len(rows), "offset": offset, "limit": limit, "reports": page})
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-sent events: one 'snapshot', then 'report'/'removed' deltas as files change."""
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def watch():
+        etag, _ = project_validator()
+        last = snapshot()
+        yield sse('snapshot', [dict(r, project=name) for name, r in sorted(last.items())])
+        idle = 0.0
+        while True:
+            time.sleep(POLL_SECONDS)
+            idle += POLL_SECONDS
+            current_etag, _ = project_validator()
+            if current_etag == etag:
+                if idle >= KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+                continue
+
+            etag, current, idle = current_etag, snapshot(), 0.0
+            for name, report in sorted(current.items()):
+                if last.get(name) != report:
+                    yield sse('report', dict(report, project=name))
+            for name in sorted(set(last) - set(current)):
+                yield sse('removed', {"project": name})
+            last = current
+
+    resp = Response(stream_with_context(watch()), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
+
+@app.route('/cache')
+def cache_status():
+    with _CACHE_LOCK:
+        return jsonify(dict(CACHE_STATS, entries=len(_REPORT_CACHE)))
 
 # ANSI Colors for terminal debugging
 G, Y, R, RESET = "\033[92m", "\033[93m", "\033[91m", "\033[0m"
 
 def audit_file(path):
     try:
-        with open(path, 'r') as f:
-            data = yaml.safe_load(f)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = journal.overlay(yaml.safe_load(f), path)
+        else:
+            data = journal.overlay({}, path)
         
         if not isinstance(data, dict):
             raise ValueError("Not a dictionary")
 
+        quarter = quarter_view(data)
+        if quarter is not None:
+            return audit_quarter(path, quarter)
+
         meta = data.get('project_metadata', {})
         total_val, done_val = 0, 0
         scheduled_tasks = []
@@ -72,18 +171,100 @@ def audit_file(path):
             'scheduled_tasks': []
         }
 
+def audit_quarter(path, quarter):
+    """Calendar feed for a Cerberus quarter; compact files only expand days with user data."""
+    name = os.path.basename(path)
+    scheduled_tasks = [{'day': int(date[8:10]), 'date_day': int(date[8:10]), 'month': int(date[5:7]), 'name': entry}
+                       for date, entries in user_days(quarter) for entry in entries]
+    return {
+        'display': name,
+        'display_name': name,
+        'status': 'G',
+        'last_updated': datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M"),
+        'alert_msg': '',
+        'pct': 100,
+        'progress': 100,
+        'scheduled_tasks': scheduled_tasks
+    }
+
+def project_paths():
+    # Includes heads that so far only have a journal (plays log before any YAML exists)
+    return journal.heads(PROJECTS_DIR)
+
+def _journal_sig(path):
+    try:
+        st = os.stat(journal.journal_path(path))
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+def cached_audit(path):
+    """Stat-keyed front for audit_file: only re-parses when inode/mtime/size move."""
+    try:
+        st = os.stat(path)
+        ysig = (st.st_ino, st.st_mtime_ns, st.st_size)
+    except OSError:
+        ysig = None  # Journal-only head: keyed on the journal alone
+
+    sig = (ysig, _journal_sig(path))
+    with _CACHE_LOCK:
+        entry = _REPORT_CACHE.get(path)
+        if entry and entry[0] == sig:
+            CACHE_STATS['hits'] += 1
+            return entry[1]
+
+    report = audit_file(path)
+    with _CACHE_LOCK:
+        _REPORT_CACHE[path] = (sig, report)
+        CACHE_STATS['misses'] += 1
+    return report
+
+def project_validator():
+    """Aggregate (etag, last_modified) over every project and journal stat. No parsing."""
+    digest = hashlib.sha1()
+    newest = 0
+    for path in sorted(project_paths()):
+        try:
+            st = os.stat(path)
+            ysig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            ysig = None  # Journal-only head
+        jsig = _journal_sig(path)
+        if ysig is None and jsig is None:
+            continue
+        digest.update(f"{path}|{ysig}|{jsig}\n".encode())
+        newest = max(newest, ysig[0] if ysig else 0, jsig[0] if jsig else 0)
+    last_modified = datetime.fromtimestamp(newest // 10**9, timezone.utc)
+    return digest.hexdigest(), last_modified
+
+def rendered_page(etag):
+    """Plain and gzip bodies for this validator; renders only when the etag moved."""
+    with _RENDER_LOCK:
+        if _RENDERED["etag"] != etag:
+            html = render_template('dashboard.html', reports=collect_reports()).encode('utf-8')
+            _RENDERED.update(etag=etag, html=html, gzip=gzip.compress(html, compresslevel=6))
+        return _RENDERED["html"], _RENDERED["gzip"]
+
+def snapshot():
+    """One pass over PROJECTS_DIR: {filename: report}, evicting deleted files from the cache."""
+    reports, seen = {}, set()
+    for path in project_paths():
+        seen.add(path)
+        reports[os.path.basename(path)] = cached_audit(path)
+
+    with _CACHE_LOCK:
+        for gone in set(_REPORT_CACHE) - seen:
+            del _REPORT_CACHE[gone]
+            CACHE_STATS['evictions'] += 1
+    return reports
+
+def collect_reports():
+    return list(snapshot().values())
+
 def run_pulse():
-    results = []
-    alerts = []
-    
-    for filename in os.listdir(PROJECTS_DIR):
-        if filename.endswith(".yml") and filename != "playbook.yml":
-            report = audit_file(os.path.join(PROJECTS_DIR, filename))
-            results.append(report)
-            
-            # Special Handling for Alert Tab
-            if report['status'] == 'R':
-                alerts.append(report)
+    results = collect_reports()
+    # Special Handling for Alert Tab
+    alerts = [r for r in results if r['status'] == 'R']
     
     results.sort(key=lambda x: x['last_updated'], reverse=True)
     
@@ -6,10 +6,9 @@ source ~/agent_mark2_venv/bin/activate
 echo "--- DOMINA SYNC INITIALIZED ---"
 
 # 2. Project Audits (Sage/Core-Ledger)
-# Add any new projects here as they are created
+# New projects under /data/projects are picked up automatically
 echo "[1/3] Auditing Projects..."
-python3 ~/agents/ledger.py --project painter
-python3 ~/agents/ledger.py --project ledger
+python3 ~/agents/ledger.py --all
 
 # 3. Quarterly Integrity Check (Cerberus)
 echo "[2/3] Checking Schedule Integrity..."
@@ -1,31 +1,179 @@
 import json
 import os
+import mmap
+import argparse
+from datetime import datetime, timedelta
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 
-def echo_library():
-    # Using the correct filename we just discovered
-    library_path = os.path.expanduser("~/data/sisyphus_feed.jsonl")
-    
-    if not os.path.exists(library_path):
-        print(f"❌ File not found at {library_path}")
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+FEED_PATH = os.path.expanduser("~/data/sisyphus_feed.jsonl")
+# Work unit for the pool; small enough that --limit can stop early on a multi-GB feed
+CHUNK_BYTES = 8 * 1024 * 1024
+# --tail reads backwards in blocks of this size
+TAIL_BLOCK = 64 * 1024
+# First of these a record carries is its timestamp (ISO string or epoch seconds)
+TIME_KEYS = ("ts", "timestamp", "created_at", "published", "date")
+
+def record_time(data):
+    for key in TIME_KEYS:
+        value = data.get(key)
+        if value is None:
+            continue
+        try:
+            if isinstance(value, (int, float)):
+                return float(value)
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+def parse_since(text):
+    """'2025-12-20', '2025-12-20T15:00' or relative '90m' / '6h' / '3d' -> epoch seconds."""
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+    if text[-1:] in units and text[:-1].isdigit():
+        return (datetime.now() - timedelta(**{units[text[-1]]: int(text[:-1])})).timestamp()
+    return datetime.fromisoformat(text).timestamp()
+
+def matches(line, src, grep, since):
+    """Decoded record if the raw line passes every filter, else None."""
+    # Cheap byte test before paying for a decode (ASCII needles only: JSON may escape the rest)
+    if grep and grep.isascii() and grep.encode() not in line.lower():
+        return None
+    try:
+        data = loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if src and str(data.get('src', '')).lower() != src:
+        return None
+    if grep and grep not in str(data.get('text', '')).lower():
+        return None
+    if since is not None:
+        # Undated records (the feed today is just src/text) pass: --since can only rule out what it can date
+        ts = record_time(data)
+        if ts is not None and ts < since:
+            return None
+    return data
+
+def scan_chunk(path, start, end, src, grep, since, limit):
+    """Pool worker: decode and filter one newline-aligned byte range."""
+    out = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in mm[start:end].splitlines():
+            data = matches(line, src, grep, since)
+            if data is not None:
+                out.append(data)
+                if limit and len(out) >= limit:
+                    break
+    return out
+
+def chunk_bounds(path, chunk_bytes=CHUNK_BYTES):
+    """[(start, end)] covering the file, each ending just after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds, start = [], 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        while start < size:
+            cut = mm.find(b'\n', min(start + chunk_bytes, size) - 1)
+            end = size if cut == -1 else cut + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+def stream(path, src=None, grep=None, since=None, limit=None, workers=None):
+    """Matching records in file order. Chunks fan out over a process pool through a sliding
+    window; results come back in order and the pool is abandoned as soon as --limit is met."""
+    bounds = chunk_bounds(path)
+    if len(bounds) <= 1:
+        for start, end in bounds:
+            yield from scan_chunk(path, start, end, src, grep, since, limit)
         return
+    emitted = 0
+    workers = workers or os.cpu_count() or 1
+    pending = iter(bounds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounded window: only ~2 chunks per worker in flight, so the parent never holds the feed
+        window = deque(pool.submit(scan_chunk, path, s, e, src, grep, since, limit)
+                       for s, e in islice(pending, 2 * workers))
+        try:
+            while window:
+                results = window.popleft().result()
+                for s, e in islice(pending, 1):
+                    window.append(pool.submit(scan_chunk, path, s, e, src, grep, since, limit))
+                for data in results:
+                    yield data
+                    emitted += 1
+                    if limit and emitted >= limit:
+                        return
+        finally:
+            for future in window:
+                future.cancel()
 
+def tail(path, count, src=None, grep=None, since=None):
+    """Last `count` matching records, oldest first, reading backwards from EOF."""
+    found = []
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        carry = b''
+        while pos > 0 and len(found) < count:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + carry).split(b'\n')
+            # The first piece may be the back half of a line that starts in the next block up
+            carry = lines.pop(0) if pos > 0 else b''
+            for line in reversed(lines):
+                data = matches(line, src, grep, since) if line.strip() else None
+                if data is not None:
+                    found.append(data)
+                    if len(found) >= count:
+                        break
+    found.reverse()
+    return found
+
+def show(data):
+    # Map the keys: 'src' for source, 'text' for content
+    source = str(data.get('src', 'Unknown'))
+    content = str(data.get('text', 'No Intel Found'))
+
+    # Clean up HTML tags if they exist
+    clean_content = content.replace('<p>', '').replace('</p>', ' ').strip()
+
+    print(f"📍 SOURCE: {source.upper()}")
+    print(f"💡 INTEL: {clean_content[:100]}...")
+    print("-" * 30)
+
+def echo_library(path=FEED_PATH, src=None, grep=None, since=None, limit=None, tail_n=None, workers=None):
+    if not os.path.exists(path):
+        print(f"❌ File not found at {path}")
+        return
+
+    src = src.lower() if src else None
+    grep = grep.lower() if grep else None
     print(f"📜 Sisyphus is reading the scrolls...\n")
-    with open(library_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-                # Map the keys: 'src' for source, 'text' for content
-                source = data.get('src', 'Unknown')
-                content = data.get('text', 'No Intel Found')
-                
-                # Clean up HTML tags if they exist
-                clean_content = content.replace('<p>', '').replace('</p>', ' ').strip()
-                
-                print(f"📍 SOURCE: {source.upper()}")
-                print(f"💡 INTEL: {clean_content[:100]}...")
-                print("-" * 30)
-            except json.JSONDecodeError:
-                continue
+    records = tail(path, tail_n, src, grep, since) if tail_n else stream(path, src, grep, since, limit, workers)
+    for data in records:
+        show(data)
 
 if __name__ == "__main__":
-    echo_library()
+    parser = argparse.ArgumentParser(description="Read the Sisyphus raw feed")
+    parser.add_argument('--feed', default=FEED_PATH, help="JSONL feed to read")
+    parser.add_argument('--src', help="Only records from this source (case-insensitive)")
+    parser.add_argument('--grep', help="Only records whose text contains this (case-insensitive)")
+    parser.add_argument('--since', help="ISO date/time, or relative like 6h / 3d (undated records always pass)")
+    parser.add_argument('--limit', type=int, help="Stop after this many matches")
+    parser.add_argument('--tail', type=int, metavar='N', help="Last N matches, read from the end of the file")
+    parser.add_argument('--workers', type=int, help="Decode processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    echo_library(args.feed, args.src, args.grep, parse_since(args.since) if args.since else None,
+                 args.limit, args.tail, args.workers)
@@ -1,4 +1,5 @@
-﻿import os, sys, json, time, argparse
+﻿import os, sys, json, glob, time, random, socket, sqlite3, hashlib, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 import tweepy
@@ -9,6 +10,23 @@ from atproto import Client
 DOTENV_PATH = "/home/kuro/data/.env"
 load_dotenv(DOTENV_PATH)
 
+# Posting budgets as (posts per hour, burst). Mastodon allows 300 statuses / 3h;
+# Bluesky's createRecord costs 3 of 5000 points / hour.
+RATE_LIMITS = {"mastodon": (100, 5), "bsky": (1600, 10)}
+# Transient failures: attempts per post, and the cap on one jittered backoff sleep
+RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+# Exception class names (from Mastodon.py / atproto) worth a retry
+TRANSIENT_MARKERS = ("Network", "Timeout", "Ratelimit", "RateLimit", "Server", "Connection")
+# Non-idempotent platforms only retry what provably never reached the server:
+# connection-stage failures, and responses that say the request was refused unprocessed
+CONNECT_MARKERS = ("ConnectError", "ConnectTimeout", "NewConnectionError", "NameResolution")
+NOT_PROCESSED_STATUS = (429, 503)
+# --serve: durable outbox, and how often an idle worker rescans the spool directory
+OUTBOX_PATH = "/home/kuro/data/lolth_outbox.db"
+SPOOL_POLL = 2.0
+
 def log_env_vars():
     print("\n--- Loaded Environment Variables (Debug) ---", file=sys.stderr)
     print(f"X_KEY (start): {os.getenv('X_CONSUMER_KEY', 'N/A')[:4]}", file=sys.stderr)
@@ -16,43 +34,309 @@ def log_env_vars():
     print(f"BLUESKY_HANDLE: {os.getenv('BLUESKY_HANDLE', 'N/A')}", file=sys.stderr)
     print("-------------------------------------------\n", file=sys.stderr)
 
-def post_to_mastodon(text):
-    try:
-        m = Mastodon(api_base_url=os.getenv("MASTODON_API_BASE_URL"), access_token=os.getenv("MASTODON_ACCESS_TOKEN"))
-        status = m.status_post(text)
-        return {"platform": "mastodon", "status": "success", "url": status.url}
-    except Exception as e:
-        return {"platform": "mastodon", "status": "failed", "error": str(e)}
-
-def post_to_bluesky(text):
-    try:
-        client = Client()
-        client.login(os.getenv("BLUESKY_HANDLE"), os.getenv("BLUESKY_APP_PASSWORD"))
-        post = client.send_post(text=text)
-        return {"platform": "bsky", "status": "success", "url": post.uri}
-    except Exception as e:
-        return {"platform": "bsky", "status": "failed", "error": str(e)}
-
-def run_preformatted_post_workflow(task_id, payload):
-    results = []
+# --- PLATFORM ADAPTERS ---
+def connect_mastodon():
+    return Mastodon(api_base_url=os.getenv("MASTODON_API_BASE_URL"), access_token=os.getenv("MASTODON_ACCESS_TOKEN"))
+
+def post_to_mastodon(m, text, key):
+    # Mastodon dedupes on Idempotency-Key, so a retry after an ambiguous timeout is safe
+    return m.status_post(text, idempotency_key=key).url
+
+def connect_bluesky():
+    client = Client(base_url=os.getenv("BLUESKY_BASE_URL") or None)
+    client.login(os.getenv("BLUESKY_HANDLE"), os.getenv("BLUESKY_APP_PASSWORD"))
+    return client
+
+def post_to_bluesky(client, text, key):
+    return client.send_post(text=text).uri
+
+# name -> (connect, send, send is idempotent)
+PLATFORMS = {"mastodon": (connect_mastodon, post_to_mastodon, True),
+             "bsky": (connect_bluesky, post_to_bluesky, False)}
+
+# --- ENGINE ---
+class TokenBucket:
+    """Blocking token bucket: `burst` posts at once, then `per_hour` spread evenly."""
+    def __init__(self, per_hour, burst):
+        self.rate = per_hour / 3600.0
+        self.capacity = self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def _chain(e):
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        yield e
+        e = e.__cause__ or e.__context__
+
+def is_transient(e):
+    return isinstance(e, (ConnectionError, TimeoutError)) or any(m in type(e).__name__ for m in TRANSIENT_MARKERS)
+
+def never_sent(e):
+    """True only when the post cannot have landed: the connection was never made, or the
+    server answered 429/503 (refused before processing)."""
+    for x in _chain(e):
+        if isinstance(x, (ConnectionRefusedError, socket.gaierror)) or any(m in type(x).__name__ for m in CONNECT_MARKERS):
+            return True
+        status = getattr(getattr(x, "response", None), "status_code", None)
+        if status in NOT_PROCESSED_STATUS:
+            return True
+    return False
+
+class PlatformSession:
+    """One authenticated client per platform, reused for every post. Posts are serialized
+    per platform (the bucket decides when) and retried with full-jitter backoff; a platform
+    without idempotent sends only retries failures that never reached it."""
+    def __init__(self, name, connect, send, bucket, idempotent=False):
+        self.name, self.connect, self.send, self.bucket = name, connect, send, bucket
+        self.idempotent = idempotent
+        self.client = None
+        self.lock = threading.Lock()
+
+    def post(self, text, key):
+        attempts = 0
+        with self.lock:
+            while True:
+                attempts += 1
+                sending = False
+                try:
+                    if self.client is None:
+                        self.client = self.connect()
+                    self.bucket.acquire()
+                    sending = True
+                    url = self.send(self.client, text, key)
+                    return {"platform": self.name, "status": "success", "url": url, "attempts": attempts}
+                except Exception as e:
+                    # Logins are always safe to repeat; a post only if it is idempotent or never left
+                    retry = is_transient(e) if (self.idempotent or not sending) else never_sent(e)
+                    if not retry or attempts >= RETRIES:
+                        self.client = None  # Maybe an expired session: log in afresh next time
+                        return {"platform": self.name, "status": "failed", "error": str(e), "attempts": attempts}
+                    time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempts)))
+
+class PostingEngine:
+    def __init__(self, platforms=PLATFORMS, limits=RATE_LIMITS):
+        self.sessions = {name: PlatformSession(name, connect, send, TokenBucket(*limits[name]), idempotent)
+                         for name, (connect, send, idempotent) in platforms.items()}
+        self.pool = ThreadPoolExecutor(max_workers=len(self.sessions))
+
+    def publish(self, text, platforms, task_id=None):
+        """Fans one post out to every target platform at once; results keep target order.
+        Each (task, platform) gets a stable idempotency key, so retries dedupe server-side."""
+        futures = []
+        for p in platforms:
+            if p in self.sessions:
+                key = hashlib.sha256(f"{task_id or text}:{p}".encode()).hexdigest()
+                futures.append(self.pool.submit(self.sessions[p].post, text, key))
+        return [f.result() for f in futures]
+
+_ENGINE = None
+
+def default_engine():
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = PostingEngine()
+    return _ENGINE
+
+def run_preformatted_post_workflow(task_id, payload, engine=None):
     text = payload.get("final_post_text", "")
     platforms = payload.get("platforms_to_post", [])
-    
-    if "mastodon" in platforms:
-        results.append(post_to_mastodon(text))
-    if "bsky" in platforms:
-        results.append(post_to_bluesky(text))
-    return results
+    return (engine or default_engine()).publish(text, platforms, task_id)
+
+def bridge(data):
+    """Sisyphus superset -> Lolth payload; anything else passes through untouched."""
+    if "distribution" not in data:
+        return data
+    first_p = list(data["distribution"].keys())[0]
+    mapping = {"MA": "mastodon", "BS": "bsky"}
+    return {
+        "final_post_text": data["distribution"][first_p]["body"],
+        "platforms_to_post": [mapping.get(k, k.lower()) for k in data["distribution"].keys()]
+    }
+
+def task_id_for(data):
+    """Explicit task_id (top level or meta), else a content hash so a re-sent superset is a no-op."""
+    meta = data.get("meta")
+    tid = data.get("task_id") or (meta.get("task_id") if isinstance(meta, dict) else None)
+    if tid:
+        return str(tid)
+    return "sha-" + hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+
+# --- DURABLE OUTBOX ---
+class Outbox:
+    """SQLite outbox. A platform is marked 'sending' (and committed) before its post goes out,
+    so after a crash that platform becomes 'uncertain' instead of being posted twice."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (task_id TEXT PRIMARY KEY, payload TEXT NOT NULL,
+            status TEXT NOT NULL, enqueued REAL NOT NULL, updated REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS deliveries (task_id TEXT NOT NULL, platform TEXT NOT NULL,
+            status TEXT NOT NULL, url TEXT, error TEXT, attempts INTEGER, updated REAL NOT NULL,
+            PRIMARY KEY (task_id, platform));
+        CREATE INDEX IF NOT EXISTS tasks_open ON tasks (status, enqueued);
+    """
+
+    def __init__(self, path=OUTBOX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(self.SCHEMA)
+
+    def enqueue(self, task_id, payload):
+        """True if new; a task_id already in the outbox is ignored whatever its state."""
+        with self.db:
+            cur = self.db.execute("INSERT OR IGNORE INTO tasks VALUES (?, ?, 'pending', ?, ?)",
+                                  (task_id, json.dumps(payload), time.time(), time.time()))
+        return cur.rowcount == 1
+
+    def recover(self):
+        """Run once at startup: posts caught mid-flight by a crash are never retried blindly."""
+        with self.db:
+            return self.db.execute("UPDATE deliveries SET status = 'uncertain', updated = ? "
+                                   "WHERE status = 'sending'", (time.time(),)).rowcount
+
+    def next_open(self):
+        row = self.db.execute("SELECT task_id, payload FROM tasks WHERE status IN ('pending', 'sending') "
+                              "ORDER BY enqueued LIMIT 1").fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def claim(self, task_id, platforms, supported):
+        """Marks the platforms not yet attempted as 'sending'; returns them. Targets outside
+        `supported` are settled as 'unsupported' at once, never left to look in flight."""
+        done = {r[0] for r in self.db.execute("SELECT platform FROM deliveries WHERE task_id = ?", (task_id,))}
+        fresh = [p for p in dict.fromkeys(platforms) if p not in done]
+        todo = [p for p in fresh if p in supported]
+        with self.db:
+            self.db.execute("UPDATE tasks SET status = 'sending', updated = ? WHERE task_id = ?", (time.time(), task_id))
+            self.db.executemany("INSERT INTO deliveries VALUES (?, ?, 'sending', NULL, NULL, 0, ?)",
+                                [(task_id, p, time.time()) for p in todo])
+            self.db.executemany("INSERT INTO deliveries VALUES (?, ?, 'unsupported', NULL, ?, 0, ?)",
+                                [(task_id, p, "no session for platform", time.time()) for p in fresh if p not in supported])
+        return todo
+
+    def record(self, task_id, result):
+        with self.db:
+            self.db.execute("UPDATE deliveries SET status = ?, url = ?, error = ?, attempts = ?, updated = ? "
+                            "WHERE task_id = ? AND platform = ?",
+                            (result["status"], result.get("url"), result.get("error"), result.get("attempts", 0),
+                             time.time(), task_id, result["platform"]))
+
+    def finish(self, task_id):
+        """Settles the task from its deliveries: done, failed, or uncertain (needs a human)."""
+        rows = self.db.execute("SELECT platform, status, url, error, attempts FROM deliveries WHERE task_id = ?",
+                               (task_id,)).fetchall()
+        states = {r[1] for r in rows}
+        status = "uncertain" if "uncertain" in states else "failed" if states - {"success"} else "done"
+        with self.db:
+            self.db.execute("UPDATE tasks SET status = ?, updated = ? WHERE task_id = ?", (status, time.time(), task_id))
+        results = [{"platform": p, "status": st, "url": url, "error": err, "attempts": n} for p, st, url, err, n in rows]
+        return status, results
+
+    def counts(self):
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+def ingest_lines(outbox, lines, source):
+    added = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            # Valid JSON that is not an object ([], "x", 1) is as unusable as a torn line
+            print(f"LOLTH_BAD_LINE|{source}|{line[:60]}", file=sys.stderr)
+            continue
+        added += outbox.enqueue(task_id_for(data), data)
+    return added
+
+def ingest_spool(outbox, spool):
+    """Enqueues every *.json / *.ndjson in the spool, then moves it to spool/done/.
+    Producers should write elsewhere and rename in, so a half-written file is never read."""
+    done_dir = os.path.join(spool, "done")
+    os.makedirs(done_dir, exist_ok=True)
+    added = 0
+    for path in sorted(glob.glob(os.path.join(spool, "*.json")) + glob.glob(os.path.join(spool, "*.ndjson"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            added += ingest_lines(outbox, f, os.path.basename(path))
+        os.replace(path, os.path.join(done_dir, os.path.basename(path)))
+    return added
+
+def drain(outbox, engine):
+    """Posts every open task, oldest first. Each finished task is reported as one JSON line."""
+    while (task := outbox.next_open()):
+        task_id, data = task
+        payload = bridge(data)
+        todo = outbox.claim(task_id, payload.get("platforms_to_post", []), engine.sessions)
+        for result in engine.publish(payload.get("final_post_text", ""), todo, task_id):
+            outbox.record(task_id, result)
+        status, results = outbox.finish(task_id)
+        print(json.dumps({"task_id": task_id, "status": status, "results": results}), flush=True)
+
+def serve(outbox_path=OUTBOX_PATH, spool=None):
+    """--serve: NDJSON supersets from stdin (until EOF) or a spool directory (forever)."""
+    outbox, engine = Outbox(outbox_path), default_engine()
+    stranded = outbox.recover()
+    if stranded:
+        print(f"LOLTH_UNCERTAIN|{stranded} deliveries were in flight at the last crash; not retried", file=sys.stderr)
+
+    if spool:
+        while True:
+            ingest_spool(outbox, spool)
+            drain(outbox, engine)
+            time.sleep(SPOOL_POLL)
+
+    # stdin: a reader thread commits lines to the outbox as they arrive, the worker drains it
+    wake, eof = threading.Event(), threading.Event()
+    def reader():
+        inbox = Outbox(outbox_path)
+        for line in sys.stdin:
+            if ingest_lines(inbox, [line], "stdin"):
+                wake.set()
+        eof.set()
+        wake.set()
+    threading.Thread(target=reader, daemon=True).start()
+    while True:
+        drain(outbox, engine)
+        if eof.is_set() and outbox.next_open() is None:
+            break
+        wake.wait()
+        wake.clear()
+    print(f"LOLTH_OUTBOX|{json.dumps(outbox.counts())}", file=sys.stderr)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--task_id", required=True)
-    parser.add_argument("--workflow_type", required=True)
-    parser.add_argument("--payload_json_string", required=True)
+    parser.add_argument("--task_id")
+    parser.add_argument("--workflow_type")
+    parser.add_argument("--payload_json_string")
+    parser.add_argument("--serve", action="store_true", help="Long-running worker over a durable outbox")
+    parser.add_argument("--spool", metavar="DIR", help="With --serve: watch DIR for NDJSON files instead of stdin")
+    parser.add_argument("--outbox", default=OUTBOX_PATH, help="SQLite outbox path")
     args = parser.parse_args()
 
     log_env_vars()
-    
+
+    if args.serve:
+        serve(args.outbox, args.spool)
+        sys.exit(0)
+    if not (args.task_id and args.workflow_type and args.payload_json_string):
+        parser.error("--task_id, --workflow_type and --payload_json_string are required without --serve")
+
     raw_input = args.payload_json_string
     if raw_input == "-":
         raw_input = sys.stdin.read()
@@ -60,14 +344,7 @@ if __name__ == "__main__":
     data = json.loads(raw_input)
     
     # Bridge Sisyphus Superset to Lolth
-    payload_data = {}
-    if "distribution" in data:
-        first_p = list(data["distribution"].keys())[0]
-        payload_data["final_post_text"] = data["distribution"][first_p]["body"]
-        mapping = {"MA": "mastodon", "BS": "bsky"}
-        payload_data["platforms_to_post"] = [mapping.get(k, k.lower()) for k in data["distribution"].keys()]
-    else:
-        payload_data = data
+    payload_data = bridge(data)
 
     report = {
         "task_id": args.task_id,
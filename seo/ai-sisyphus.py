@@ -4,12 +4,13 @@ import json
 import yaml
 import argparse
 from datetime import datetime
+import library
 
 # --- SYSTEM MANDATES: ABSOLUTE PATHS ---
 DATA_DIR = "/home/kuro/data"
 BRANDING_PATH = os.path.join(DATA_DIR, "dsop_branding_v1.yml")
-RAW_FEED_PATH = os.path.join(DATA_DIR, "sisyphus_feed.jsonl")
-LIBRARY_PATH = os.path.join(DATA_DIR, "library.yml")
+RAW_FEED_PATH = library.RAW_FEED_PATH
+LIBRARY_PATH = library.LIBRARY_PATH
 
 class SisyphusMark3:
     def __init__(self):
@@ -25,39 +26,28 @@ class SisyphusMark3:
             sys.exit(1)
 
     def refine_intel(self):
-        """Moves raw JSONL entries into the permanent YAML library."""
+        """Moves new raw JSONL entries into the permanent library (incremental, deduplicated)."""
         if not os.path.exists(RAW_FEED_PATH):
             print("DEBUG: No raw feed found to refine.", file=sys.stderr)
             return
 
-        with open(RAW_FEED_PATH, 'r', encoding='utf-8') as f:
-            raw_items = [json.loads(line) for line in f]
-
-        library = []
-        if os.path.exists(LIBRARY_PATH):
-            with open(LIBRARY_PATH, 'r', encoding='utf-8') as f:
-                library = yaml.safe_load(f) or []
-
-        for item in raw_items:
-            library.append({
-                'origin': item.get('src', 'unknown'),
-                'text': item.get('text', ''),
-                'refined_at': datetime.now().isoformat()
-            })
-
-        with open(LIBRARY_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(library, f, default_flow_style=False)
-        print(f"SUCCESS: {len(raw_items)} items refined into {LIBRARY_PATH}", file=sys.stderr)
+        added, duplicates = library.Library().ingest(RAW_FEED_PATH)
+        print(f"SUCCESS: {added} items refined into {LIBRARY_PATH} ({duplicates} duplicates skipped)", file=sys.stderr)
 
     def get_harvest(self):
-        """Pulls the latest entry from the YAML library."""
-        if not os.path.exists(LIBRARY_PATH):
+        """Pulls the latest entry from the library (one index probe, whatever its size)."""
+        if not os.path.exists(LIBRARY_PATH) and not os.path.exists(library.LEGACY_YAML_PATH):
             return "Library is empty. Run --refine first."
-        with open(LIBRARY_PATH, 'r', encoding='utf-8') as f:
-            library = yaml.safe_load(f)
-            if library and len(library) > 0:
-                return library[-1].get('text')
-            return "No entries found in YAML library."
+        latest = library.Library().latest()
+        if latest:
+            return latest.get('text')
+        return "No entries found in library."
+
+    def search(self, query="", origin=None, k=10, hashtags=False):
+        """BM25 top-k over the library; hashtags=True adds the brand's primary hashtags as terms."""
+        if hashtags:
+            query = " ".join([query or ""] + list(self.seo.get('hashtags', {}).get('primary', [])))
+        return library.Library().search(query, origin, k)
 
     def generate_superset(self, content, platforms, schedule=None):
         """Generates the Master JSON for Lolth."""
@@ -86,8 +76,12 @@ class SisyphusMark3:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Mark 3 Sisyphus Agency Agent")
     parser.add_argument('--raw', type=str, help="Direct text input")
-    parser.add_argument('--harvest', action='store_true', help="Pull from YAML library")
-    parser.add_argument('--refine', action='store_true', help="Refine raw JSONL into YAML library")
+    parser.add_argument('--harvest', action='store_true', help="Pull the latest library entry")
+    parser.add_argument('--refine', action='store_true', help="Refine raw JSONL into the library")
+    parser.add_argument('--harvest-query', nargs='?', const="", metavar='QUERY',
+                        help="Pull the best library match for QUERY (BM25)")
+    parser.add_argument('--hashtags', action='store_true', help="With --harvest-query: also match the brand's primary hashtags")
+    parser.add_argument('--origin', help="With --harvest-query: only entries from this origin")
     parser.add_argument('-MA', action='store_true', help="Route to Mastodon")
     parser.add_argument('-BS', action='store_true', help="Route to BlueSky")
     parser.add_argument('--dry-run', action='store_true', help="Output JSON to stdout")
@@ -101,6 +95,12 @@ if __name__ == "__main__":
     content = ""
     if args.raw:
         content = args.raw
+    elif args.harvest_query is not None:
+        hits = sisyphus.search(args.harvest_query, args.origin, k=1, hashtags=args.hashtags)
+        if hits:
+            content = hits[0]['text']
+        else:
+            print("DEBUG: No library entry matches the query.", file=sys.stderr)
     elif args.harvest:
         content = sisyphus.get_harvest()
 
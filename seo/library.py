@@ -0,0 +1,213 @@
+import os
+import re
+import html
+import json
+import hashlib
+import sqlite3
+import argparse
+import yaml
+from datetime import datetime
+
+DATA_DIR = "/home/kuro/data"
+RAW_FEED_PATH = os.path.join(DATA_DIR, "sisyphus_feed.jsonl")
+# Entries, their content-hash index and the feed's byte-offset checkpoint, in one file
+LIBRARY_PATH = os.path.join(DATA_DIR, "library.db")
+# Pre-SQLite library; imported once, then kept as library.yml.migrated
+LEGACY_YAML_PATH = os.path.join(DATA_DIR, "library.yml")
+FIELDS = ('id', 'origin', 'text', 'refined_at')
+# FTS5 inverted index over entries.plain (the text with its HTML stripped, so markup like
+# span/class/href never matches or skews BM25); triggers keep it in step with every write.
+# unicode61 drops '#', so a hashtag and the bare word share one posting list.
+FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE library_fts USING fts5(plain, content='entries', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2');
+    CREATE TRIGGER entries_ai AFTER INSERT ON entries BEGIN
+        INSERT INTO library_fts(rowid, plain) VALUES (new.id, new.plain);
+    END;
+    CREATE TRIGGER entries_ad AFTER DELETE ON entries BEGIN
+        INSERT INTO library_fts(library_fts, rowid, plain) VALUES ('delete', old.id, old.plain);
+    END;
+    CREATE TRIGGER entries_au AFTER UPDATE OF plain ON entries BEGIN
+        INSERT INTO library_fts(library_fts, rowid, plain) VALUES ('delete', old.id, old.plain);
+        INSERT INTO library_fts(rowid, plain) VALUES (new.id, new.plain);
+    END;
+"""
+# PRAGMA user_version once the index is over entries.plain; older files get migrated on open
+FTS_VERSION = 1
+
+def content_hash(text):
+    """Whitespace-insensitive digest of an entry's text: the dedup key."""
+    return hashlib.sha256(" ".join(str(text).split()).encode('utf-8')).hexdigest()
+
+def strip_markup(text):
+    """Visible text of an HTML fragment: tags dropped, entities decoded."""
+    return " ".join(html.unescape(re.sub(r"<[^>]*>", " ", str(text))).split())
+
+def shape(item, refined_at):
+    """Raw feed line -> library record."""
+    return {'origin': item.get('src', item.get('origin', 'unknown')),
+            'text': item.get('text', ''),
+            'refined_at': refined_at}
+
+class Library:
+    """SQLite-backed library. id is insertion order, so the newest entry is the rightmost
+    rowid; refined_at and origin carry their own indexes."""
+    def __init__(self, path=LIBRARY_PATH, legacy_path=LEGACY_YAML_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE,
+                origin TEXT, text TEXT, refined_at TEXT, plain TEXT);
+            CREATE INDEX IF NOT EXISTS entries_refined ON entries (refined_at);
+            CREATE INDEX IF NOT EXISTS entries_origin ON entries (origin, id);
+            CREATE TABLE IF NOT EXISTS checkpoint (feed TEXT PRIMARY KEY, inode INTEGER, offset INTEGER);
+            DROP TABLE IF EXISTS seen;
+        """)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < FTS_VERSION:
+            self._index_plain()
+        if legacy_path and os.path.exists(legacy_path):
+            self.migrate(legacy_path)
+
+    def _index_plain(self):
+        """Once per file: backfill entries.plain and rebuild the index over it (older libraries
+        had no index, or one over the raw HTML)."""
+        self.db.executescript("""
+            DROP TRIGGER IF EXISTS entries_ai;
+            DROP TRIGGER IF EXISTS entries_ad;
+            DROP TRIGGER IF EXISTS entries_au;
+            DROP TABLE IF EXISTS library_fts;
+        """)
+        if 'plain' not in {r[1] for r in self.db.execute("PRAGMA table_info(entries)")}:
+            self.db.execute("ALTER TABLE entries ADD COLUMN plain TEXT")
+        with self.db:
+            # Backfill before the triggers exist: they would 'delete' NULLs the index never held
+            self.db.executemany("UPDATE entries SET plain = ? WHERE id = ?",
+                                [(strip_markup(text), i) for i, text in self.db.execute("SELECT id, text FROM entries")])
+        self.db.executescript(FTS_SCHEMA)
+        with self.db:
+            self.db.execute("INSERT INTO library_fts(library_fts) VALUES ('rebuild')")
+            self.db.execute(f"PRAGMA user_version = {FTS_VERSION}")
+
+    def migrate(self, legacy_path):
+        """One-shot YAML import, oldest first; the YAML is renamed so it never runs twice."""
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            legacy = yaml.safe_load(f) or []
+        # Same shaping as the feed, so legacy 'src' keys keep their origin
+        records = [shape(e, str(e.get('refined_at', ''))) for e in legacy if isinstance(e, dict)]
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO entries (hash, origin, text, refined_at, plain) VALUES (?, ?, ?, ?, ?)",
+                ((content_hash(r['text']), r['origin'], r['text'], r['refined_at'], strip_markup(r['text']))
+                 for r in records))
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+    # --- Reads ---
+    def _rows(self, sql, args=()):
+        return [dict(r) for r in self.db.execute(f"SELECT {', '.join(FIELDS)} FROM entries {sql}", args)]
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def latest(self):
+        rows = self._rows("ORDER BY id DESC LIMIT 1")
+        return rows[0] if rows else None
+
+    def get(self, entry_id):
+        rows = self._rows("WHERE id = ?", (entry_id,))
+        return rows[0] if rows else None
+
+    def between(self, start, end, limit=None):
+        """Entries with start <= refined_at < end (ISO strings compare in time order)."""
+        return self._rows("WHERE refined_at >= ? AND refined_at < ? ORDER BY refined_at LIMIT ?",
+                          (start, end, -1 if limit is None else limit))
+
+    def by_origin(self, origin, limit=None):
+        """Newest first."""
+        return self._rows("WHERE origin = ? ORDER BY id DESC LIMIT ?", (origin, -1 if limit is None else limit))
+
+    def search(self, query, origin=None, k=10):
+        """Top-k entries by BM25 for any of the query's words; best first, with their score."""
+        terms = re.findall(r"\w+", query or "")
+        if not terms:
+            return []
+        match = " OR ".join('"%s"' % t for t in dict.fromkeys(terms))
+        sql = (f"SELECT {', '.join('e.' + f for f in FIELDS)}, bm25(library_fts) AS score "
+               "FROM library_fts JOIN entries e ON e.id = library_fts.rowid WHERE library_fts MATCH ?")
+        args = [match]
+        if origin:
+            sql += " AND e.origin = ?"
+            args.append(origin)
+        sql += " ORDER BY score LIMIT ?"
+        args.append(k)
+        return [dict(r) for r in self.db.execute(sql, args)]
+
+    # --- Ingestion ---
+    def checkpoint(self, feed_path):
+        row = self.db.execute("SELECT inode, offset FROM checkpoint WHERE feed = ?", (feed_path,)).fetchone()
+        return tuple(row) if row else (None, 0)
+
+    def ingest(self, feed_path=RAW_FEED_PATH):
+        """Streams the feed from the last checkpoint and inserts only unseen entries.
+
+        Returns (added, duplicates). Entries and checkpoint commit together. A rotated or truncated
+        feed restarts at byte 0; the hash index absorbs the replay. A trailing line without its
+        newline is left for next run.
+        """
+        st = os.stat(feed_path)
+        inode, offset = self.checkpoint(feed_path)
+        if inode != st.st_ino or offset > st.st_size:
+            offset = 0
+
+        refined_at = datetime.now().isoformat()
+        added = duplicates = 0
+        with self.db, open(feed_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(item, dict):
+                    continue
+                rec = shape(item, refined_at)
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO entries (hash, origin, text, refined_at, plain) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash(rec['text']), rec['origin'], rec['text'], rec['refined_at'], strip_markup(rec['text'])))
+                if cur.rowcount:
+                    added += 1
+                else:
+                    duplicates += 1
+            self.db.execute("INSERT OR REPLACE INTO checkpoint VALUES (?, ?, ?)", (feed_path, st.st_ino, offset))
+        return added, duplicates
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the Sisyphus library")
+    parser.add_argument('--latest', action='store_true', help="Newest entry")
+    parser.add_argument('--id', type=int, help="Entry by id")
+    parser.add_argument('--origin', help="Entries from one origin, newest first (or a --search filter)")
+    parser.add_argument('--search', metavar='QUERY', help="BM25 top hits for the query's words")
+    parser.add_argument('--from', dest='start', help="refined_at lower bound (ISO, inclusive)")
+    parser.add_argument('--to', dest='end', default="9999", help="refined_at upper bound (ISO, exclusive)")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    lib = Library()
+    if args.latest:
+        rows = [lib.latest()] if lib.count() else []
+    elif args.id is not None:
+        rows = [r for r in [lib.get(args.id)] if r]
+    elif args.search:
+        rows = lib.search(args.search, args.origin, args.limit)
+    elif args.origin:
+        rows = lib.by_origin(args.origin, args.limit)
+    elif args.start:
+        rows = lib.between(args.start, args.end, args.limit)
+    else:
+        rows = []
+        print(f"LIBRARY|{LIBRARY_PATH}|entries={lib.count()}")
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
@@ -1,32 +1,14 @@
-import json
-import yaml
 import os
+import library
 
 RAW_FEED = "/home/kuro/data/sisyphus_feed.jsonl"
-YAML_LIB = "/home/kuro/data/library.yml"
+LIBRARY_DB = library.LIBRARY_PATH
 
 def refine():
     if not os.path.exists(RAW_FEED):
         return
 
-    # 1. Read Raw JSONL
-    new_items = []
-    with open(RAW_FEED, 'r') as f:
-        for line in f:
-            new_items.append(json.loads(line))
+    # Streams only what the feed gained since the last checkpoint; known texts are skipped
+    added, duplicates = library.Library(LIBRARY_DB).ingest(RAW_FEED)
 
-    # 2. Load Existing YAML Library
-    library = []
-    if os.path.exists(YAML_LIB):
-        with open(YAML_LIB, 'r') as f:
-            library = yaml.safe_load(f) or []
-
-    # 3. Merge (Avoiding duplicates by text hash if needed)
-    # For now, we just append the new batch
-    library.extend(new_items)
-
-    # 4. Save back to YAML
-    with open(YAML_LIB, 'w') as f:
-        yaml.dump(library, f, default_flow_style=False)
-    
-    print(f"SUCCESS: Migrated {len(new_items)} items to {YAML_LIB}")
\ No newline at end of file
+    print(f"SUCCESS: Migrated {added} items to {LIBRARY_DB} ({duplicates} duplicates skipped)")
\ No newline at end of file
@@ -1,31 +1,110 @@
 ﻿import sys
-import requests
+import os
+import json
 import time
+import random
+import sqlite3
+import hashlib
+import requests
 import yaml # NEW: Import PyYAML for compliant data handling
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # NOTE: This agent no longer uses argparse or a main block.
 # It is designed to be called by the Mark 3 harness.
 
-def brand_content_with_llm(generic_content: str, config: dict) -> dict:
-    """
-    Applies branding to the generic content by using a local vLLM server.
-    
-    Args:
-        generic_content: The raw text string to be branded.
-        config: A dictionary containing agent configuration, including the 
-                'vllm_api_url' and 'llm_params'.
-    
-    Returns:
-        A YAML-compliant dictionary of branded metadata.
-    """
-    
-    # 1. Compliant Configuration (URL and Parameters from the config dictionary)
-    api_url = config.get("vllm_api_url", "http://localhost:8080/generate")
-    llm_params = config.get("llm_params", {})
-    
+# Defaults for the config keys this module reads (all overridable per call)
+DEFAULT_API_URL = "http://localhost:8080/generate"
+CACHE_PATH = "/home/kuro/data/dsop_cache.db"
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 10000
+# Once over capacity, evict down to this fraction of it so eviction runs rarely, not per put
+CACHE_LOW_WATER = 0.9
+MAX_CONCURRENCY = 8
+
+PROMPT = "Act as a world-class financial analyst and digital marketer. Your task is to take the following raw, generic text and re-write it to be compelling, professional, and SEO-optimized for a corporate blog post. The re-written content must be a single, concise paragraph.\n\nRaw Text: {content}\n\nRe-written Content:"
+
+FAILED = {
+    "title": "LLM Branding Failed",
+    "keywords": [],
+    "branded_description": "Failed to generate branded content from vLLM.",
+    "model": "vLLM"
+}
+
+_SESSIONS = {}
+
+def get_session(pool_size):
+    """One keep-alive connection pool per process (per pool size), reused across calls."""
+    if pool_size not in _SESSIONS:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _SESSIONS[pool_size] = session
+    return _SESSIONS[pool_size]
+
+class ResponseCache:
+    """Persistent branded-text cache keyed by sha256(payload). Entries expire after `ttl`
+    seconds; past `max_entries` the expired, then the least recently used, are evicted."""
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl, self.max_entries = ttl, max_entries
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                        "created REAL NOT NULL, used REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        self.size = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        row = self.db.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            if now - row[1] > self.ttl:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= 1
+                return None
+            self.db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key, text):
+        now = time.time()
+        with self.db:
+            if self.db.execute("INSERT OR IGNORE INTO responses VALUES (?, ?, ?, ?)", (key, text, now, now)).rowcount:
+                self.size += 1
+            else:
+                self.db.execute("UPDATE responses SET text = ?, created = ?, used = ? WHERE key = ?", (text, now, now, key))
+            if self.size > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now):
+        """Expired rows first (range scan on `created`), then LRU down to the low-water mark."""
+        self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        self.db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                        "ORDER BY used DESC LIMIT -1 OFFSET ?)", (int(self.max_entries * CACHE_LOW_WATER),))
+        self.size = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+_CACHES = {}
+
+def get_cache(path, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+    """One open cache (one SQLite connection) per path per process, reused across calls."""
+    if path not in _CACHES:
+        _CACHES[path] = ResponseCache(path, ttl, max_entries)
+    cache = _CACHES[path]
+    cache.ttl, cache.max_entries = ttl, max_entries
+    return cache
+
+def build_payload(generic_content, llm_params):
     # Base payload structure
-    payload = {
-        "prompt": f"Act as a world-class financial analyst and digital marketer. Your task is to take the following raw, generic text and re-write it to be compelling, professional, and SEO-optimized for a corporate blog post. The re-written content must be a single, concise paragraph.\n\nRaw Text: {generic_content}\n\nRe-written Content:",
+    return {
+        "prompt": PROMPT.format(content=generic_content),
         "use_beam_search": False,
         "n": 1,
         "best_of": 1,
@@ -36,39 +115,95 @@ def brand_content_with_llm(generic_content: str, config: dict) -> dict:
         **llm_params
     }
 
-    max_retries = config.get("max_retries", 3)
-    retry_delay = config.get("retry_delay", 1)
+def branded(branded_text):
+    # 3. YAML-Compliant Output Structure (Returns a dictionary)
+    return {
+        "title": "Optimized by vLLM DSOP",
+        "keywords": ["AI", "branding", "LLM", "SEO", "vLLM"],
+        "branded_description": branded_text,
+        "model": "vLLM"
+    }
 
+def _generate(session, api_url, payload, max_retries, retry_delay, timeout):
+    """One prompt against vLLM: the branded text, or None once retries run out."""
     for attempt in range(max_retries):
         try:
             print(f"Calling vLLM server for content branding (Attempt {attempt + 1}/{max_retries})...", file=sys.stderr)
-            
+
             # 2. Renounced JSON for API Call (Still uses JSON for API protocol, but output is YAML-ready)
-            response = requests.post(api_url, json=payload, timeout=60)
+            response = session.post(api_url, json=payload, timeout=timeout)
             response.raise_for_status()
 
             api_result = response.json()
 
             if api_result and api_result.get('text'):
-                branded_text = api_result['text'][0]
-
-                # 3. YAML-Compliant Output Structure (Returns a dictionary)
-                return {
-                    "title": "Optimized by vLLM DSOP",
-                    "keywords": ["AI", "branding", "LLM", "SEO", "vLLM"],
-                    "branded_description": branded_text,
-                    "model": "vLLM"
-                }
-            
-            # Error handling remains functional
-            ...
+                return api_result['text'][0]
+
+            print("vLLM returned no text.", file=sys.stderr)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"vLLM call failed: {e}", file=sys.stderr)
+
+        # Error handling remains functional: exponential backoff with jitter
+        if attempt + 1 < max_retries:
+            time.sleep(retry_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+    return None
+
+def brand_contents_with_llm(generic_contents: list, config: dict) -> list:
+    """
+    Batched branding: identical payloads are sent once, cache hits skip the server,
+    and the misses go out concurrently over a pooled session.
+
+    Args:
+        generic_contents: Raw text strings to be branded.
+        config: Agent configuration. Besides 'vllm_api_url' and 'llm_params' it accepts
+                'max_concurrency', 'cache_path' (None disables the cache), 'cache_ttl',
+                'cache_max_entries', 'max_retries', 'retry_delay' and 'timeout'.
+
+    Returns:
+        One YAML-compliant dictionary of branded metadata per input, in input order.
+    """
+
+    # 1. Compliant Configuration (URL and Parameters from the config dictionary)
+    api_url = config.get("vllm_api_url", DEFAULT_API_URL)
+    llm_params = config.get("llm_params", {})
+    concurrency = max(1, int(config.get("max_concurrency", MAX_CONCURRENCY)))
+    cache_path = config.get("cache_path", CACHE_PATH)
+    cache = get_cache(cache_path, config.get("cache_ttl", CACHE_TTL),
+                      config.get("cache_max_entries", CACHE_MAX_ENTRIES)) if cache_path else None
+
+    payloads = [build_payload(c, llm_params) for c in generic_contents]
+    keys = [ResponseCache.key(p) for p in payloads]
+    texts = {}
+    for key, payload in zip(keys, payloads):
+        if key not in texts:
+            texts[key] = cache.get(key) if cache else None
+
+    misses = {key: payload for key, payload in zip(keys, payloads) if texts[key] is None}
+    if misses:
+        session = get_session(concurrency)
+        args = (config.get("max_retries", 3), config.get("retry_delay", 1), config.get("timeout", 60))
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(misses))) as pool:
+            futures = {key: pool.submit(_generate, session, api_url, payload, *args) for key, payload in misses.items()}
+        for key, future in futures.items():
+            texts[key] = future.result()
+            if cache and texts[key] is not None:
+                cache.put(key, texts[key])
 
     # Final return block (still YAML-compliant dictionary)
-    return {
-        "title": "LLM Branding Failed",
-        "keywords": [],
-        "branded_description": "Failed to generate branded content from vLLM.",
-        "model": "vLLM"
-    }
+    return [branded(texts[key]) if texts[key] is not None else dict(FAILED) for key in keys]
+
+def brand_content_with_llm(generic_content: str, config: dict) -> dict:
+    """
+    Applies branding to the generic content by using a local vLLM server.
+    
+    Args:
+        generic_content: The raw text string to be branded.
+        config: A dictionary containing agent configuration, including the 
+                'vllm_api_url' and 'llm_params'.
+    
+    Returns:
+        A YAML-compliant dictionary of branded metadata.
+    """
+    return brand_contents_with_llm([generic_content], config)[0]
 
 # NOTE: The Argparse and if __name__ == "__main__": block is entirely removed.
\ No newline at end of file